@@ -4,10 +4,13 @@ Uses SQLite for local storage - no external database needed!
 """
 
 import os
+import asyncio
+import hashlib
 import logging
 import aiosqlite
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator
 
 from dotenv import load_dotenv
 
@@ -17,94 +20,368 @@ logger = logging.getLogger("database")
 # Database file stored in project folder
 DB_PATH = os.path.join(os.path.dirname(__file__), "data", "student_data.db")
 
+# Per-connection PRAGMAs (not persisted in the database file, so they are
+# re-applied every time a connection is opened)
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",      # ~64 MB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA busy_timeout=5000",      # wait up to 5s for a lock instead of failing
+)
+
+
+# Columns callers actually read from a student record (everything but created_at)
+STUDENT_COLUMNS = "id, email, name, university, course, batch, discord_id, is_verified, verified_at"
+
+# Number of read-only connections kept open alongside the single writer
+READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", 4))
+
+# Audit log entries are buffered and written in batches: every
+# LOG_FLUSH_INTERVAL seconds, or sooner once LOG_FLUSH_BATCH entries are queued
+LOG_FLUSH_INTERVAL = 1.0
+LOG_FLUSH_BATCH = 100
+
+
+# Full schema - every statement is idempotent, so it runs on each startup.
+SCHEMA_SQL = """
+-- WAL is persistent: readers no longer block behind writers and
+-- commits only need an fsync at checkpoint time
+PRAGMA journal_mode=WAL;
+
+-- Students table - Your main student registry
+-- email is UNIQUE - prevents duplicate students
+-- discord_id is UNIQUE - prevents one student verifying multiple accounts
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT UNIQUE NOT NULL,
+    name TEXT,
+    university TEXT,
+    course TEXT NOT NULL,
+    batch TEXT,
+    discord_id INTEGER UNIQUE,
+    is_verified INTEGER DEFAULT 0,
+    verified_at TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- OTP storage table - Temporary OTP codes
+CREATE TABLE IF NOT EXISTS otp_codes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL,
+    code TEXT NOT NULL,
+    discord_id INTEGER NOT NULL,
+    student_name TEXT,
+    attempts INTEGER DEFAULT 0,
+    expires_at TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Verification logs - For audit trail
+CREATE TABLE IF NOT EXISTS verification_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT,
+    discord_id INTEGER,
+    action TEXT NOT NULL,
+    status TEXT NOT NULL,
+    details TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- SMTP account usage - survives restarts so the mail switcher doesn't
+-- pile onto an account that already used its daily quota
+CREATE TABLE IF NOT EXISTS smtp_state (
+    account TEXT PRIMARY KEY,
+    sent INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Emails are stored lowercased so lookups use the UNIQUE index on email directly.
+-- One-shot migration for rows written before normalization. Rows differing only in case
+-- would collide once lowercased, so each such group first keeps just its best row - the
+-- verified one, else the already-lowercase one, else the newest. Groups with more than
+-- one verified row can't be merged safely and are left as-is for an admin (reported at startup).
+DELETE FROM students WHERE id IN (
+    SELECT id FROM (
+        SELECT id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY LOWER(email)
+                   ORDER BY is_verified DESC, email = LOWER(email) DESC, id DESC
+               ) AS pick,
+               SUM(is_verified) OVER (PARTITION BY LOWER(email)) AS verified
+        FROM students
+        WHERE LOWER(email) IN (SELECT LOWER(email) FROM students WHERE email <> LOWER(email))
+    )
+    WHERE pick > 1 AND COALESCE(verified, 0) <= 1
+);
+UPDATE students SET email = LOWER(email)
+WHERE email <> LOWER(email)
+  AND LOWER(email) NOT IN (
+      SELECT LOWER(email) FROM students GROUP BY LOWER(email) HAVING COUNT(*) > 1
+  );
+UPDATE otp_codes SET email = LOWER(email) WHERE email <> LOWER(email);
+DROP INDEX IF EXISTS idx_students_email_lower;
+DROP INDEX IF EXISTS idx_otp_email_lower;
+
+-- OTP expiry is compared against datetime('now') as text. Rows written before that moved
+-- into SQL hold Python isoformat ('YYYY-MM-DDTHH:MM:SS.ffffff'), whose 'T' sorts after
+-- the ' ' of datetime('now') - rewrite them in SQLite's format so they expire on time.
+UPDATE otp_codes SET expires_at = datetime(expires_at) WHERE expires_at LIKE '%T%';
+
+-- One pending OTP per Discord user - lets store_otp UPSERT on discord_id.
+-- Older databases used a non-unique index; drop it and any stale duplicates first.
+DROP INDEX IF EXISTS idx_otp_discord;
+DELETE FROM otp_codes WHERE id NOT IN (
+    SELECT MAX(id) FROM otp_codes GROUP BY discord_id
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_otp_discord_unique ON otp_codes(discord_id);
+CREATE INDEX IF NOT EXISTS idx_otp_email ON otp_codes(email);
+"""
+
+# TEXT columns added after the first release: table -> columns ALTERed into older databases
+# (the migrations above only touch columns every version has had)
+ADDED_COLUMNS = {
+    "students": ("batch", "university"),
+    "otp_codes": ("student_name",),  # Rides along with the pending OTP so /reverify needs no students lookup
+}
+
+
+async def _open_connection(database: str, uri: bool = False) -> aiosqlite.Connection:
+    """Open a connection with tuned PRAGMAs applied"""
+    conn = await aiosqlite.connect(database, uri=uri)
+    conn.row_factory = aiosqlite.Row
+    for pragma in CONNECTION_PRAGMAS:
+        await conn.execute(pragma)
+    return conn
+
+
+async def _query_one(conn: aiosqlite.Connection, sql: str, params: tuple):
+    """Run a query and return its first row"""
+    cursor = await conn.execute(sql, params)
+    row = await cursor.fetchone()
+    await cursor.close()
+    return row
+
+
+def normalize_email(email: str) -> str:
+    """Canonical form emails are stored and looked up in"""
+    return email.strip().lower()
+
+
+def hash_otp(code: str) -> bytes:
+    """SHA-256 digest OTPs are stored as, so pending codes never sit in the DB in plaintext"""
+    return hashlib.sha256(code.encode()).digest()
+
+
+class ConnectionPool:
+    """
+    One read-write connection plus N read-only connections.
+    In WAL mode readers never block the writer (or each other), so
+    SELECT-only methods are served from the reader queue while writes
+    are serialized on the single writer.
+    """
+    
+    def __init__(self, db_path: str, read_size: int = READ_POOL_SIZE):
+        self.db_path = db_path
+        self.read_size = read_size
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: asyncio.Queue = asyncio.Queue()
+        self._reader_conns: list = []
+    
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+    
+    async def open_writer(self):
+        """Open the read-write connection (creates the database file if needed)"""
+        if self._writer is None:
+            self._writer = await _open_connection(self.db_path)
+    
+    async def open_readers(self):
+        """Open the read-only connections - call after the schema exists"""
+        ro_uri = f"file:{self.db_path}?mode=ro"
+        while len(self._reader_conns) < self.read_size:
+            conn = await _open_connection(ro_uri, uri=True)
+            self._reader_conns.append(conn)
+            self._readers.put_nowait(conn)
+    
+    async def close(self):
+        """Close every connection in the pool"""
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns.clear()
+        self._readers = asyncio.Queue()
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+    
+    async def fetchone(self, sql: str, params: tuple = ()):
+        """Run a read query on a pooled reader and return the first row"""
+        if not self._reader_conns:
+            async with self._write_lock:
+                return await _query_one(self._writer, sql, params)
+        conn = await self._readers.get()
+        try:
+            return await _query_one(conn, sql, params)
+        finally:
+            self._readers.put_nowait(conn)
+    
+    async def fetchall(self, sql: str, params: tuple = ()):
+        """Run a read query on a pooled reader and return all rows"""
+        if not self._reader_conns:
+            async with self._write_lock:
+                return await self._writer.execute_fetchall(sql, params)
+        conn = await self._readers.get()
+        try:
+            return await conn.execute_fetchall(sql, params)
+        finally:
+            self._readers.put_nowait(conn)
+    
+    async def execute(self, sql: str, params: tuple = ()) -> int:
+        """Run and commit a single write statement; returns the affected row count"""
+        async with self._write_lock:
+            try:
+                cursor = await self._writer.execute(sql, params)
+                await self._writer.commit()
+                return cursor.rowcount
+            finally:
+                if self._writer.in_transaction:
+                    await self._writer.rollback()
+    
+    @asynccontextmanager
+    async def acquire_read(self):
+        """Borrow a read-only connection (falls back to the writer if no readers are open)"""
+        if not self._reader_conns:
+            async with self.acquire_write() as conn:
+                yield conn
+            return
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+    
+    @asynccontextmanager
+    async def acquire_write(self):
+        """Borrow the writer; one method's statements + commit never interleave with another's"""
+        async with self._write_lock:
+            try:
+                yield self._writer
+            finally:
+                # Don't leave a half-finished transaction open on the shared connection
+                # (e.g. a method that caught an IntegrityError without committing)
+                if self._writer.in_transaction:
+                    await self._writer.rollback()
+
 
 class Database:
     """SQLite Database handler for local storage"""
     
     def __init__(self):
         self.db_path = DB_PATH
+        self._pool: Optional[ConnectionPool] = None
+        # Buffered verification_logs rows + the background task that flushes them
+        self._log_queue: deque = deque()
+        self._log_flush_event = asyncio.Event()
+        self._log_task: Optional[asyncio.Task] = None
+        self._log_stopping = False  # Set by close(): the writer exits after its current flush
         # Ensure data directory exists
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
     
     async def connect(self):
-        """Initialize the database and create tables"""
+        """Open the connection pool and create tables"""
         try:
+            if self._pool is None:
+                self._pool = ConnectionPool(self.db_path)
+            await self._pool.open_writer()
             await self._create_tables()
+            await self._pool.open_readers()
+            if self._log_task is None or self._log_task.done():
+                self._log_stopping = False
+                self._log_task = asyncio.create_task(self._log_writer())
             logger.info(f"SQLite database initialized at {self.db_path}")
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
     async def close(self):
-        """Placeholder for compatibility - SQLite doesn't need connection pool closing"""
+        """Flush buffered logs and close all pooled connections"""
+        if self._log_task is not None:
+            # Ask the writer to finish rather than cancelling it - a cancel landing mid-flush
+            # would drop the entries it had already taken off the queue
+            self._log_stopping = True
+            self._log_flush_event.set()
+            await self._log_task
+            self._log_task = None
+        if self._pool is not None and self._pool.is_open:
+            try:
+                await self._flush_logs()
+            except Exception as e:
+                logger.error(f"Failed to write {len(self._log_queue)} verification log(s) on close: {e}")
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
         logger.info("Database closed")
     
-    async def _get_connection(self):
-        """Get a database connection"""
-        conn = await aiosqlite.connect(self.db_path)
-        conn.row_factory = aiosqlite.Row
-        return conn
+    async def _ensure_pool(self):
+        """Lazily connect if a method is used before connect()"""
+        if self._pool is None or not self._pool.is_open:
+            await self.connect()
+    
+    async def _fetchone(self, sql: str, params: tuple = ()):
+        """Single-row read straight through the pool"""
+        await self._ensure_pool()
+        return await self._pool.fetchone(sql, params)
+    
+    async def _fetchall(self, sql: str, params: tuple = ()):
+        """Multi-row read straight through the pool"""
+        await self._ensure_pool()
+        return await self._pool.fetchall(sql, params)
+    
+    async def _execute(self, sql: str, params: tuple = ()) -> int:
+        """Single committed write; returns the affected row count"""
+        await self._ensure_pool()
+        return await self._pool.execute(sql, params)
+    
+    @asynccontextmanager
+    async def _read(self):
+        """Borrow a read-only connection for SELECT-only methods"""
+        await self._ensure_pool()
+        async with self._pool.acquire_read() as conn:
+            yield conn
+    
+    @asynccontextmanager
+    async def _write(self):
+        """Borrow the read-write connection"""
+        await self._ensure_pool()
+        async with self._pool.acquire_write() as conn:
+            yield conn
     
     async def _create_tables(self):
         """Create required tables if they don't exist"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            # Students table - Your main student registry
-            # email is UNIQUE - prevents duplicate students
-            # discord_id is UNIQUE - prevents one student verifying multiple accounts
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS students (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT UNIQUE NOT NULL,
-                    name TEXT,
-                    university TEXT,
-                    course TEXT NOT NULL,
-                    batch TEXT,
-                    discord_id INTEGER UNIQUE,
-                    is_verified INTEGER DEFAULT 0,
-                    verified_at TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+        async with self._pool.acquire_write() as conn:
+            # Whole schema (tables, migrations, indices) parsed and run in one call
+            await conn.executescript(SCHEMA_SQL)
             
-            # Add batch column if it doesn't exist (for existing databases)
-            try:
-                await conn.execute("ALTER TABLE students ADD COLUMN batch TEXT")
-                logger.info("Added 'batch' column to existing database")
-            except Exception:
-                pass  # Column already exists
-            
-            # Add university column if it doesn't exist (for existing databases)
-            try:
-                await conn.execute("ALTER TABLE students ADD COLUMN university TEXT")
-                logger.info("Added 'university' column to existing database")
-            except Exception:
-                pass  # Column already exists
-            
-            # OTP storage table - Temporary OTP codes
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS otp_codes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT NOT NULL,
-                    code TEXT NOT NULL,
-                    discord_id INTEGER NOT NULL,
-                    attempts INTEGER DEFAULT 0,
-                    expires_at TEXT NOT NULL,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            # Anything still mixed-case is a case-only duplicate the migration couldn't merge
+            cursor = await conn.execute(
+                "SELECT id, email, discord_id FROM students WHERE email <> LOWER(email)"
+            )
+            for row in await cursor.fetchall():
+                logger.warning(
+                    f"Student {row['id']} ({row['email']}, discord {row['discord_id']}) duplicates a verified "
+                    f"student differing only in email case - resolve by hand; lookups can't reach it"
                 )
-            """)
             
-            # Verification logs - For audit trail
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS verification_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT,
-                    discord_id INTEGER,
-                    action TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    details TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+            # Add newer columns only if missing (for existing databases)
+            for table, added in ADDED_COLUMNS.items():
+                cursor = await conn.execute(f"PRAGMA table_info({table})")
+                columns = {row[1] for row in await cursor.fetchall()}
+                for column in added:
+                    if column not in columns:
+                        await conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+                        logger.info(f"Added '{column}' column to existing {table} table")
             
             await conn.commit()
             logger.info("Database tables verified/created")
@@ -114,224 +391,262 @@ class Database:
     # ============================================
     async def get_student_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get student record by email address"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            conn.row_factory = aiosqlite.Row
-            cursor = await conn.execute(
-                "SELECT * FROM students WHERE LOWER(email) = LOWER(?)",
-                (email,)
-            )
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+        email = normalize_email(email)
+        row = await self._fetchone(f"SELECT {STUDENT_COLUMNS} FROM students WHERE email = ?", (email,))
+        return dict(row) if row else None
     
     async def get_student_by_discord_id(self, discord_id: int) -> Optional[Dict[str, Any]]:
         """Get student record by Discord ID"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            conn.row_factory = aiosqlite.Row
-            cursor = await conn.execute(
-                "SELECT * FROM students WHERE discord_id = ?",
-                (discord_id,)
-            )
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+        row = await self._fetchone(f"SELECT {STUDENT_COLUMNS} FROM students WHERE discord_id = ?", (discord_id,))
+        return dict(row) if row else None
     
     async def is_email_already_verified(self, email: str) -> bool:
         """Check if email is already linked to a Discord account"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute(
-                """
-                SELECT discord_id FROM students 
-                WHERE LOWER(email) = LOWER(?) AND discord_id IS NOT NULL
-                """,
-                (email,)
-            )
-            result = await cursor.fetchone()
-            return result is not None
+        email = normalize_email(email)
+        row = await self._fetchone(
+            "SELECT EXISTS(SELECT 1 FROM students WHERE email = ? AND discord_id IS NOT NULL)",
+            (email,)
+        )
+        return bool(row[0])
     
     async def is_discord_id_used(self, discord_id: int) -> bool:
         """Check if this Discord ID is already linked to any email"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute(
-                "SELECT id FROM students WHERE discord_id = ?",
-                (discord_id,)
-            )
-            result = await cursor.fetchone()
-            return result is not None
+        row = await self._fetchone("SELECT EXISTS(SELECT 1 FROM students WHERE discord_id = ?)", (discord_id,))
+        return bool(row[0])
     
     async def verify_student(self, email: str, discord_id: int) -> bool:
         """Mark a student as verified and link their Discord ID"""
-        async with aiosqlite.connect(self.db_path) as conn:
+        email = normalize_email(email)
+        try:
+            # Single statement: the NOT EXISTS guard replaces the separate
+            # "is this Discord ID already linked?" SELECT
+            updated = await self._execute(
+                """
+                UPDATE students 
+                SET discord_id = ?, is_verified = 1, verified_at = CURRENT_TIMESTAMP
+                WHERE email = ?
+                  AND NOT EXISTS (SELECT 1 FROM students WHERE discord_id = ?)
+                """,
+                (discord_id, email, discord_id)
+            )
+        except Exception as e:
+            logger.warning(f"Verification failed for {email}: {e}")
+            return False
+        if not updated:
+            logger.warning(f"Discord ID {discord_id} already linked to another account (or {email} not found)")
+            return False
+        logger.info(f"Student verified: {email} -> Discord ID {discord_id}")
+        return True
+    
+    async def verify_student_atomic(self, email: str, discord_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Verify a not-yet-verified student and return their record in one statement.
+        Returns None if the email is unknown, already verified, or the Discord ID is taken.
+        """
+        email = normalize_email(email)
+        async with self._write() as conn:
             try:
-                # First check if discord_id is already used
-                cursor = await conn.execute(
-                    "SELECT id FROM students WHERE discord_id = ?",
-                    (discord_id,)
-                )
-                if await cursor.fetchone():
-                    logger.warning(f"Discord ID {discord_id} already linked to another account")
-                    return False
-                
-                await conn.execute(
+                rows = await conn.execute_fetchall(
                     """
                     UPDATE students 
-                    SET discord_id = ?, is_verified = 1, verified_at = ?
-                    WHERE LOWER(email) = LOWER(?)
+                    SET discord_id = ?, is_verified = 1, verified_at = CURRENT_TIMESTAMP
+                    WHERE email = ?
+                      AND (is_verified = 0 OR discord_id IS NULL)
+                      AND NOT EXISTS (SELECT 1 FROM students WHERE discord_id = ?)
+                    RETURNING name, university, course, batch
                     """,
-                    (discord_id, datetime.utcnow().isoformat(), email)
+                    (discord_id, email, discord_id)
                 )
                 await conn.commit()
-                logger.info(f"Student verified: {email} -> Discord ID {discord_id}")
-                return True
             except Exception as e:
                 logger.warning(f"Verification failed for {email}: {e}")
-                return False
+                return None
+        if not rows:
+            return None
+        logger.info(f"Student verified: {email} -> Discord ID {discord_id}")
+        return dict(rows[0])
     
     async def unverify_student(self, discord_id: int) -> bool:
         """Remove verification from a student by Discord ID"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            try:
-                await conn.execute(
-                    "UPDATE students SET discord_id = NULL, is_verified = 0, verified_at = NULL WHERE discord_id = ?",
-                    (discord_id,)
-                )
-                await conn.commit()
-                logger.info(f"Student unverified: Discord ID {discord_id}")
-                return True
-            except Exception as e:
-                logger.error(f"Failed to unverify Discord ID {discord_id}: {e}")
-                return False
+        try:
+            await self._execute(
+                "UPDATE students SET discord_id = NULL, is_verified = 0, verified_at = NULL WHERE discord_id = ?",
+                (discord_id,)
+            )
+            logger.info(f"Student unverified: Discord ID {discord_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to unverify Discord ID {discord_id}: {e}")
+            return False
     
     async def get_student_course(self, email: str) -> Optional[str]:
         """Get the course name for a student"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute(
-                "SELECT course FROM students WHERE LOWER(email) = LOWER(?)",
-                (email,)
-            )
-            row = await cursor.fetchone()
-            return row[0] if row else None
+        email = normalize_email(email)
+        row = await self._fetchone("SELECT course FROM students WHERE email = ?", (email,))
+        return row[0] if row else None
     
     async def get_student_batch(self, email: str) -> Optional[str]:
         """Get the batch name for a student"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute(
-                "SELECT batch FROM students WHERE LOWER(email) = LOWER(?)",
-                (email,)
-            )
-            row = await cursor.fetchone()
-            return row[0] if row else None
+        email = normalize_email(email)
+        row = await self._fetchone("SELECT batch FROM students WHERE email = ?", (email,))
+        return row[0] if row else None
     
     async def get_student_course_and_batch(self, email: str) -> tuple[Optional[str], Optional[str]]:
         """Get both course and batch for a student"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute(
-                "SELECT course, batch FROM students WHERE LOWER(email) = LOWER(?)",
-                (email,)
-            )
-            row = await cursor.fetchone()
-            if row:
-                return (row[0], row[1])
-            return (None, None)
+        email = normalize_email(email)
+        row = await self._fetchone("SELECT course, batch FROM students WHERE email = ?", (email,))
+        return (row[0], row[1]) if row else (None, None)
     
     async def get_student_university_course_batch(self, email: str) -> tuple[Optional[str], Optional[str], Optional[str]]:
         """Get university, course and batch for a student"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute(
-                "SELECT university, course, batch FROM students WHERE LOWER(email) = LOWER(?)",
-                (email,)
-            )
-            row = await cursor.fetchone()
-            if row:
-                return (row[0], row[1], row[2])
-            return (None, None, None)
+        email = normalize_email(email)
+        row = await self._fetchone(
+            "SELECT university, course, batch FROM students WHERE email = ?",
+            (email,)
+        )
+        return (row[0], row[1], row[2]) if row else (None, None, None)
     
     # ============================================
     # OTP OPERATIONS
     # ============================================
-    async def store_otp(self, email: str, code: str, discord_id: int, expiry_minutes: int = 5):
-        """Store a new OTP code"""
-        expires_at = (datetime.utcnow() + timedelta(minutes=expiry_minutes)).isoformat()
-        async with aiosqlite.connect(self.db_path) as conn:
-            # Delete any existing OTP for this email/discord_id
-            await conn.execute(
-                "DELETE FROM otp_codes WHERE LOWER(email) = LOWER(?) OR discord_id = ?",
-                (email, discord_id)
-            )
-            # Insert new OTP
-            await conn.execute(
+    async def store_otp(self, email: str, code: str, discord_id: int, expiry_minutes: int = 5,
+                        cooldown_seconds: int = 0, student_name: Optional[str] = None) -> int:
+        """
+        Store a new OTP code (replaces any pending OTP for this user or email).
+        student_name is kept with it so a resend can address the email without another lookup.
+        A code issued to this user less than cooldown_seconds ago is kept instead - the check and
+        the write are one statement, so concurrent requests can't both pass it.
+        Returns 0 when stored, otherwise the seconds left on the cooldown.
+        """
+        email = normalize_email(email)
+        async with self._write() as conn:
+            # Insert or overwrite this user's OTP in a single statement, unless it is too recent
+            rows = await conn.execute_fetchall(
                 """
-                INSERT INTO otp_codes (email, code, discord_id, expires_at)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO otp_codes (email, code, discord_id, student_name, expires_at)
+                VALUES (?, ?, ?, ?, datetime('now', ?))
+                ON CONFLICT(discord_id) DO UPDATE SET
+                    email = excluded.email,
+                    code = excluded.code,
+                    student_name = excluded.student_name,
+                    expires_at = excluded.expires_at,
+                    attempts = 0,
+                    created_at = CURRENT_TIMESTAMP
+                WHERE otp_codes.created_at <= datetime('now', ?)
+                RETURNING id
                 """,
-                (email, code, discord_id, expires_at)
+                (email, hash_otp(code), discord_id, student_name, f"{expiry_minutes:+d} minutes", f"-{cooldown_seconds} seconds")
+            )
+            if not rows:
+                row = await conn.execute_fetchall(
+                    "SELECT ? - (strftime('%s', 'now') - strftime('%s', created_at)) FROM otp_codes WHERE discord_id = ?",
+                    (cooldown_seconds, discord_id)
+                )
+                await conn.commit()
+                return max(1, row[0][0]) if row else 1
+            # Another Discord user may hold a pending OTP for the same email - drop it
+            await conn.execute(
+                "DELETE FROM otp_codes WHERE email = ? AND discord_id <> ?",
+                (email, discord_id)
             )
             await conn.commit()
-            logger.info(f"OTP stored for {email}, expires at {expires_at}")
+            logger.info(f"OTP stored for {email}, expires in {expiry_minutes} minutes")
+            return 0
     
     async def verify_otp(self, discord_id: int, code: str) -> Dict[str, Any]:
         """
         Verify an OTP code
         Returns: {"valid": bool, "email": str or None, "error": str or None}
         """
-        async with aiosqlite.connect(self.db_path) as conn:
-            conn.row_factory = aiosqlite.Row
-            cursor = await conn.execute(
+        async with self._write() as conn:
+            # Happy path: a matching, unexpired, non-exhausted code is consumed in one statement.
+            # Codes are stored hashed; the plaintext alternative only matches rows written before
+            # hashing, which expire within minutes of upgrading.
+            rows = await conn.execute_fetchall(
                 """
-                SELECT email, code, attempts, expires_at 
-                FROM otp_codes WHERE discord_id = ?
-                ORDER BY created_at DESC LIMIT 1
+                DELETE FROM otp_codes
+                WHERE discord_id = ? AND code IN (?, ?)
+                  AND expires_at > datetime('now') AND attempts < 3
+                RETURNING email
                 """,
-                (discord_id,)
+                (discord_id, hash_otp(code), code)
             )
-            row = await cursor.fetchone()
+            if rows:
+                await conn.commit()
+                return {"valid": True, "email": rows[0]["email"], "error": None}
             
-            if not row:
+            # Otherwise count the attempt and find out why it failed in the same round trip
+            rows = await conn.execute_fetchall(
+                """
+                UPDATE otp_codes SET attempts = attempts + 1
+                WHERE discord_id = ?
+                RETURNING email, attempts, expires_at <= datetime('now') AS expired
+                """,
+                (discord_id,)
+            )
+            if not rows:
                 return {"valid": False, "email": None, "error": "No OTP found. Please request a new one."}
             
+            row = rows[0]
             email = row["email"]
-            stored_code = row["code"]
-            attempts = row["attempts"]
-            expires_at = datetime.fromisoformat(row["expires_at"])
-            
-            # Check expiration
-            if datetime.utcnow() > expires_at:
-                await conn.execute("DELETE FROM otp_codes WHERE discord_id = ?", (discord_id,))
-                await conn.commit()
-                return {"valid": False, "email": email, "error": "OTP expired. Please request a new one."}
+            attempts = row["attempts"] - 1   # attempts used before this one
             
-            # Check attempts
-            if attempts >= 3:
+            if row["expired"] or attempts >= 3:
                 await conn.execute("DELETE FROM otp_codes WHERE discord_id = ?", (discord_id,))
                 await conn.commit()
+                if row["expired"]:
+                    return {"valid": False, "email": email, "error": "OTP expired. Please request a new one."}
                 return {"valid": False, "email": email, "error": "Too many failed attempts. Please request a new OTP."}
             
-            # Verify code
-            if code != stored_code:
-                await conn.execute(
-                    "UPDATE otp_codes SET attempts = attempts + 1 WHERE discord_id = ?",
-                    (discord_id,)
-                )
-                await conn.commit()
-                remaining = 2 - attempts
-                return {"valid": False, "email": email, "error": f"Invalid OTP. {remaining} attempts remaining."}
-            
-            # OTP is valid - delete it
-            await conn.execute("DELETE FROM otp_codes WHERE discord_id = ?", (discord_id,))
             await conn.commit()
-            return {"valid": True, "email": email, "error": None}
+            remaining = 2 - attempts
+            return {"valid": False, "email": email, "error": f"Invalid OTP. {remaining} attempts remaining."}
     
     async def get_pending_otp(self, discord_id: int) -> Optional[Dict[str, Any]]:
-        """Check if user has a pending OTP request"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            conn.row_factory = aiosqlite.Row
-            cursor = await conn.execute(
+        """Check if user has a pending OTP request (includes the student_name stored with it)"""
+        row = await self._fetchone(
+            "SELECT email, student_name, expires_at, created_at FROM otp_codes WHERE discord_id = ?",
+            (discord_id,)
+        )
+        return dict(row) if row else None
+    
+    async def release_otp_cooldown(self, discord_id: int, code: str) -> bool:
+        """
+        Backdate a pending OTP whose email never went out, if it is still the given code.
+        The row stays (so /reverify can resend it) but store_otp's cooldown no longer blocks.
+        """
+        return bool(await self._execute(
+            "UPDATE otp_codes SET created_at = datetime('now', '-1 day') WHERE discord_id = ? AND code = ?",
+            (discord_id, hash_otp(code))
+        ))
+    
+    async def purge_expired_otps(self) -> int:
+        """Delete expired OTP codes; returns the number of rows removed"""
+        return await self._execute("DELETE FROM otp_codes WHERE expires_at < datetime('now')")
+    
+    # ============================================
+    # SMTP STATE OPERATIONS
+    # ============================================
+    async def get_smtp_state(self) -> Dict[str, int]:
+        """Per-account send counts saved within the last day (older counts are past Gmail's window)"""
+        rows = await self._fetchall(
+            "SELECT account, sent FROM smtp_state WHERE updated_at >= datetime('now', '-1 day')"
+        )
+        return {row[0]: row[1] for row in rows}
+    
+    async def set_smtp_state(self, counts: Dict[str, int]):
+        """Save per-account send counts"""
+        if not counts:
+            return
+        async with self._write() as conn:
+            await conn.executemany(
                 """
-                SELECT email, expires_at, created_at 
-                FROM otp_codes WHERE discord_id = ?
+                INSERT INTO smtp_state (account, sent, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(account) DO UPDATE SET sent = excluded.sent, updated_at = excluded.updated_at
                 """,
-                (discord_id,)
+                list(counts.items())
             )
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+            await conn.commit()
     
     # ============================================
     # LOGGING OPERATIONS
@@ -344,107 +659,140 @@ class Database:
         status: str, 
         details: str = None
     ):
-        """Log a verification action for audit purposes"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            await conn.execute(
-                """
-                INSERT INTO verification_logs (email, discord_id, action, status, details)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (email, discord_id, action, status, details)
-            )
-            await conn.commit()
+        """Log a verification action for audit purposes (buffered, written in batches)"""
+        self._log_queue.append((email, discord_id, action, status, details))
+        if len(self._log_queue) >= LOG_FLUSH_BATCH:
+            self._log_flush_event.set()
+    
+    async def _log_writer(self):
+        """Background task: periodically write buffered log entries until close() stops it"""
+        while not self._log_stopping:
+            try:
+                await asyncio.wait_for(self._log_flush_event.wait(), LOG_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._log_flush_event.clear()
+            try:
+                await self._flush_logs()
+            except Exception as e:
+                logger.error(f"Failed to write verification logs: {e}")
+    
+    async def _flush_logs(self):
+        """Write every queued log entry in one transaction"""
+        if not self._log_queue:
+            return
+        entries = list(self._log_queue)
+        self._log_queue.clear()
+        try:
+            async with self._write() as conn:
+                await conn.executemany(
+                    """
+                    INSERT INTO verification_logs (email, discord_id, action, status, details)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    entries
+                )
+                await conn.commit()
+        except Exception:
+            # e.g. SQLITE_BUSY or a full disk - put them back ahead of anything logged since,
+            # so the next flush (or close()'s final one) retries them in order
+            self._log_queue.extendleft(reversed(entries))
+            raise
     
     # ============================================
     # ADMIN OPERATIONS
     # ============================================
     async def get_verification_stats(self) -> Dict[str, int]:
         """Get verification statistics"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute("SELECT COUNT(*) FROM students")
-            total = (await cursor.fetchone())[0]
-            
-            cursor = await conn.execute("SELECT COUNT(*) FROM students WHERE is_verified = 1")
-            verified = (await cursor.fetchone())[0]
-            
-            cursor = await conn.execute("SELECT COUNT(*) FROM otp_codes")
-            pending = (await cursor.fetchone())[0]
-            
-            return {
-                "total_students": total or 0,
-                "verified": verified or 0,
-                "unverified": (total or 0) - (verified or 0),
-                "pending_otps": pending or 0
-            }
+        row = await self._fetchone(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM students) AS total,
+                (SELECT COALESCE(SUM(is_verified), 0) FROM students) AS verified,
+                (SELECT COUNT(*) FROM otp_codes) AS pending
+            """
+        )
+        total, verified, pending = row["total"], row["verified"], row["pending"]
+        
+        return {
+            "total_students": total,
+            "verified": verified,
+            "unverified": total - verified,
+            "pending_otps": pending
+        }
     
     async def add_student(self, email: str, name: str, course: str, batch: str = "", university: str = "") -> bool:
         """Add a new student to the database (supports 5-column CSV format with university)"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            try:
-                await conn.execute(
-                    """
-                    INSERT INTO students (email, name, university, course, batch)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (email, name, university, course, batch)
-                )
-                await conn.commit()
-                return True
-            except Exception as e:
-                logger.warning(f"Student already exists or error: {email} - {e}")
-                return False
+        if await self.add_students_bulk([(email, name, course, batch, university)]):
+            return True
+        logger.warning(f"Student already exists or error: {normalize_email(email)}")
+        return False
+    
+    async def add_students_bulk(self, rows: list) -> int:
+        """
+        Insert many students in one transaction; existing emails are skipped
+        rows: iterable of tuples (email, name, course, batch, university)
+        Returns the number of students actually added
+        """
+        rows = [
+            (normalize_email(email), name, university, course, batch)
+            for email, name, course, batch, university in rows
+        ]
+        async with self._write() as conn:
+            # One prepared statement reused for every row, one transaction for the whole batch;
+            # executemany's rowcount sums the rows each INSERT actually changed
+            await conn.execute("BEGIN IMMEDIATE")
+            cursor = await conn.executemany(
+                """
+                INSERT OR IGNORE INTO students (email, name, university, course, batch)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            added = cursor.rowcount
+            await conn.commit()
+        return added
     
     async def bulk_add_students(self, students: list) -> Dict[str, int]:
         """
         Bulk add students from a list
         students: list of tuples (email, name, course)
         """
-        added = 0
-        skipped = 0
-        
-        async with aiosqlite.connect(self.db_path) as conn:
-            for email, name, course in students:
-                try:
-                    await conn.execute(
-                        """
-                        INSERT OR IGNORE INTO students (email, name, course)
-                        VALUES (?, ?, ?)
-                        """,
-                        (email, name, course)
-                    )
-                    if conn.total_changes > 0:
-                        added += 1
-                    else:
-                        skipped += 1
-                except Exception:
-                    skipped += 1
-            await conn.commit()
-        
-        return {"added": added, "skipped": skipped}
+        added = await self.add_students_bulk(
+            (email, name, course, None, None) for email, name, course in students
+        )
+        return {"added": added, "skipped": len(students) - added}
     
     # ============================================
     # ADDITIONAL ADMIN OPERATIONS
     # ============================================
+    async def _iter_students(self, sql: str, params: tuple = ()) -> AsyncIterator[dict]:
+        """Stream student rows as dicts without materializing the whole result"""
+        async with self._read() as conn:
+            async with conn.execute(sql, params) as cursor:
+                async for row in cursor:
+                    yield dict(row)
+    
+    def iter_all_students(self, limit: int = -1) -> AsyncIterator[dict]:
+        """Stream all students, newest first (limit -1 means no limit)"""
+        return self._iter_students(
+            f"SELECT {STUDENT_COLUMNS} FROM students ORDER BY created_at DESC LIMIT ?",
+            (limit,)
+        )
+    
+    def iter_verified_students(self) -> AsyncIterator[dict]:
+        """Stream verified students, most recently verified first"""
+        return self._iter_students(
+            f"SELECT {STUDENT_COLUMNS} FROM students WHERE is_verified = 1 ORDER BY verified_at DESC"
+        )
+    
     async def get_all_students(self, limit: int = 100) -> list:
         """Get all students (for admin view)"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            conn.row_factory = aiosqlite.Row
-            cursor = await conn.execute(
-                "SELECT * FROM students ORDER BY created_at DESC LIMIT ?",
-                (limit,)
-            )
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+        return [row async for row in self.iter_all_students(limit)]
     
     async def get_verified_students(self) -> list:
         """Get all verified students"""
-        async with aiosqlite.connect(self.db_path) as conn:
-            conn.row_factory = aiosqlite.Row
-            cursor = await conn.execute(
-                "SELECT * FROM students WHERE is_verified = 1 ORDER BY verified_at DESC"
-            )
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+        return [row async for row in self.iter_verified_students()]
 
 
 # Global database instance
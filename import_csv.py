@@ -17,6 +17,10 @@ Example:
 import sqlite3
 import csv
 import os
+import itertools
+
+# The bot's own schema, so the two can't drift apart
+from database import SCHEMA_SQL, ADDED_COLUMNS
 
 # Database and CSV paths
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
@@ -29,70 +33,59 @@ def setup_database():
     # Ensure data directory exists
     os.makedirs(DATA_DIR, exist_ok=True)
     
-    conn = sqlite3.connect(DB_PATH)
+    # Autocommit mode: transactions are opened/closed explicitly with BEGIN/COMMIT.
+    # The larger statement cache keeps every prepared statement of a session warm.
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, cached_statements=256)
     cursor = conn.cursor()
     
-    # Create students table with UNIQUE constraints to prevent duplicates
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS students (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            name TEXT,
-            university TEXT,
-            course TEXT NOT NULL,
-            batch TEXT,
-            discord_id INTEGER UNIQUE,
-            is_verified INTEGER DEFAULT 0,
-            verified_at TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Add batch column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE students ADD COLUMN batch TEXT")
-        print("✅ Added 'batch' column to existing database")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    # Add university column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("ALTER TABLE students ADD COLUMN university TEXT")
-        print("✅ Added 'university' column to existing database")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
+    # Tables, legacy-row migrations and indices in a single script
+    cursor.executescript(SCHEMA_SQL)
     
-    # Create OTP codes table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS otp_codes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT NOT NULL,
-            code TEXT NOT NULL,
-            discord_id INTEGER NOT NULL,
-            attempts INTEGER DEFAULT 0,
-            expires_at TEXT NOT NULL,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    # Anything still mixed-case is a case-only duplicate the migration couldn't merge
+    for student_id, email in cursor.execute("SELECT id, email FROM students WHERE email <> LOWER(email)"):
+        print(f"⚠️ Student {student_id} ({email}) duplicates a verified student differing only in email case - resolve by hand")
     
-    # Create verification logs table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS verification_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT,
-            discord_id INTEGER,
-            action TEXT NOT NULL,
-            status TEXT NOT NULL,
-            details TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    # Add newer columns only if missing (for existing databases)
+    for table, added in ADDED_COLUMNS.items():
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        for column in added:
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+                print(f"✅ Added '{column}' column to existing {table} table")
     
-    conn.commit()
     print(f"✅ Database initialized at: {DB_PATH}")
     return conn
 
 
+def iter_rows(reader, start: int, stats: dict):
+    """
+    Yield (name, email, university, course, batch) tuples ready for insertion.
+    Invalid rows are recorded in stats["skipped"] as (row_num, reason);
+    stats["rows"] counts the rows yielded.
+    """
+    for row_num, row in enumerate(reader, start=start):
+        # Clean up row - remove empty trailing columns
+        row = [col.strip() for col in row if col.strip()]
+        
+        if len(row) < 4:
+            stats["skipped"].append((row_num, "insufficient columns - need at least name, email, university, course"))
+            continue
+        
+        # Expected: name, email, university, course, batch (batch is optional)
+        name = row[0]
+        email = row[1].lower()
+        university = row[2].upper()
+        course = row[3]
+        batch = row[4] if len(row) > 4 else None
+        
+        if not email or not course:
+            stats["skipped"].append((row_num, "missing email or course"))
+            continue
+        
+        stats["rows"] += 1
+        yield (name, email, university, course, batch)
+
+
 def import_csv_data(conn):
     """Import student data from CSV file"""
     cursor = conn.cursor()
@@ -114,61 +107,43 @@ def import_csv_data(conn):
             print("Edit this file with your actual student data, then run this script again.")
         return
     
-    print(f"\n📂 Reading CSV file: {CSV_PATH}")
+    # WAL + synchronous=NORMAL: the whole import costs a single fsync at commit
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
     
-    success_count = 0
-    duplicate_count = 0
-    error_count = 0
+    print(f"\n📂 Reading CSV file: {CSV_PATH}")
     
     try:
         with open(CSV_PATH, 'r', encoding='utf-8') as f:
-            # Try to detect the CSV format
-            sample = f.read(1024)
-            f.seek(0)
-            
-            # Check if it has a header
-            sniffer = csv.Sniffer()
-            has_header = sniffer.has_header(sample)
-            
             reader = csv.reader(f)
             
-            # Skip header if present
+            # The column layout is fixed, so read the header row directly instead of
+            # sniffing - a first row that doesn't start with "Name" is treated as data
+            first = next(reader, None)
+            has_header = bool(first) and first[0].strip().lower() == "name"
             if has_header:
-                header = next(reader)
-                print(f"📋 CSV Header detected: {header}")
+                print(f"📋 CSV Header detected: {first}")
+            elif first is not None:
+                reader = itertools.chain([first], reader)
             
-            for row_num, row in enumerate(reader, start=2 if has_header else 1):
-                # Clean up row - remove empty trailing columns
-                row = [col.strip() for col in row if col.strip()]
-                
-                if len(row) < 4:
-                    print(f"⚠️ Row {row_num}: Skipping (insufficient columns - need at least name, email, university, course)")
-                    error_count += 1
-                    continue
-                
-                # Expected: name, email, university, course, batch (batch is optional)
-                name = row[0].strip()
-                email = row[1].strip().lower()
-                university = row[2].strip().upper() if len(row) > 2 else ""
-                course = row[3].strip() if len(row) > 3 else ""
-                batch = row[4].strip() if len(row) > 4 else None
-                
-                if not email or not course:
-                    print(f"⚠️ Row {row_num}: Skipping (missing email or course)")
-                    error_count += 1
-                    continue
-                
-                try:
-                    cursor.execute("""
-                        INSERT INTO students (name, email, university, course, batch)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (name, email, university, course, batch))
-                    success_count += 1
-                except sqlite3.IntegrityError:
-                    print(f"⏭️ Duplicate: {email}")
-                    duplicate_count += 1
+            stats = {"rows": 0, "skipped": []}
+            
+            # Rows stream straight from the file into one prepared statement inside a single
+            # transaction; duplicates are ignored by the UNIQUE email constraint
+            cursor.execute("PRAGMA cache_size=-200000")
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany("""
+                INSERT OR IGNORE INTO students (name, email, university, course, batch)
+                VALUES (?, ?, ?, ?, ?)
+            """, iter_rows(reader, 2 if has_header else 1, stats))
+            success_count = cursor.rowcount
+            cursor.execute("COMMIT")
+        
+        duplicate_count = stats["rows"] - success_count
+        error_count = len(stats["skipped"])
         
-        conn.commit()
+        for row_num, reason in stats["skipped"]:
+            print(f"⚠️ Row {row_num}: Skipping ({reason})")
         
         print("\n" + "=" * 50)
         print("📊 Import Summary")
@@ -184,6 +159,8 @@ def import_csv_data(conn):
         print(f"\n📈 Total students in database: {total}")
         
     except Exception as e:
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
         print(f"\n❌ Error reading CSV: {e}")
 
 
@@ -258,10 +235,11 @@ def main():
             confirm = input("⚠️ This will delete ALL student data. Type 'YES' to confirm: ")
             if confirm == "YES":
                 cursor = conn.cursor()
+                cursor.execute("BEGIN")
                 cursor.execute("DELETE FROM students")
                 cursor.execute("DELETE FROM otp_codes")
                 cursor.execute("DELETE FROM verification_logs")
-                conn.commit()
+                cursor.execute("COMMIT")
                 print("✅ All data cleared!")
             else:
                 print("Cancelled.")
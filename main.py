@@ -4,15 +4,39 @@ Handles bot initialization and cog loading
 """
 
 import os
+import sys
+import json
+import gzip
+import hashlib
+import heapq
+import time
+import shutil
+import atexit
+import signal
+import queue
 import asyncio
 import logging
-from datetime import datetime
+import logging.handlers
+from typing import Optional, Dict
 
 import discord
+from discord import Activity, ActivityType, Embed, Forbidden, NotFound
 from discord.ext import commands
+from discord.ext.commands import CommandNotFound, MissingRequiredArgument, MissingPermissions
 from dotenv import load_dotenv
 
+try:
+    import zstandard as zstd
+except ImportError:  # optional - rotated logs fall back to gzip
+    zstd = None
+
+try:
+    import uvloop
+except ImportError:  # optional (not available on Windows) - default asyncio loop is used
+    uvloop = None
+
 import config
+from database import close_database
 
 # Load environment variables
 load_dotenv()
@@ -23,14 +47,73 @@ load_dotenv()
 # Create logs directory if it doesn't exist
 os.makedirs("logs", exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.FileHandler(f"logs/bot_{datetime.now().strftime('%Y%m%d')}.log"),
-        logging.StreamHandler()
-    ]
+# Size-capped rotating log file; records are buffered in memory and written in
+# batches (flushed immediately on ERROR so failures are never held back)
+_file_handler = logging.handlers.RotatingFileHandler(
+    "logs/bot.log", maxBytes=10_000_000, backupCount=14, encoding="utf-8"
+)
+
+
+def _compress_rotated_log(source: str, dest: str):
+    """Rotator: write the rotated segment compressed and drop the plain copy"""
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        if zstd is not None:
+            zstd.ZstdCompressor(level=3).copy_stream(src, dst)
+        else:
+            with gzip.GzipFile(fileobj=dst, mode="wb") as gz:
+                shutil.copyfileobj(src, gz)
+    os.remove(source)
+
+
+# Rotated backups are compressed (zstd if installed, gzip otherwise); the namer
+# gives every backup the matching suffix so rollover can shift them in order
+_file_handler.rotator = _compress_rotated_log
+_file_handler.namer = lambda name: name + (".zst" if zstd is not None else ".gz")
+_log_buffer = logging.handlers.MemoryHandler(
+    capacity=256, flushLevel=logging.ERROR, target=_file_handler
+)
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+# Loggers only enqueue records; a listener thread does the actual console/file I/O,
+# so a slow disk or a full stderr pipe never blocks the event loop
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _log_buffer, _console_handler, respect_handler_level=True
 )
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener.start()
+
+
+_logging_stopped = False
+
+
+def _shutdown_logging():
+    """Drain the queue, then write out buffered file records (safe to call more than once)"""
+    global _logging_stopped
+    if _logging_stopped:
+        return
+    _logging_stopped = True
+    _log_listener.stop()
+    _log_buffer.flush()
+
+
+atexit.register(_shutdown_logging)
+
+
+def _exit_on_sigterm(signum, frame):
+    """SIGTERM (e.g. container stop) - exit like Ctrl+C so the bot and database close cleanly"""
+    # Logging is drained by the atexit hook, after shutdown has logged its last records
+    raise SystemExit(0)
+
+
+signal.signal(signal.SIGTERM, _exit_on_sigterm)
+
 logger = logging.getLogger("discord_bot")
 
 # ============================================
@@ -38,7 +121,7 @@ logger = logging.getLogger("discord_bot")
 # ============================================
 # Required Intents for the bot to function
 intents = discord.Intents.default()
-intents.message_content = True  # Required for reading message content
+intents.message_content = False # Slash commands only - no cog reads message content
 intents.members = True          # Required for role assignment & member tracking
 intents.guilds = True           # Required for server management
 
@@ -49,84 +132,300 @@ bot = commands.Bot(
     help_command=None  # We'll create a custom help command
 )
 
+# Bot status shown after every (re)connect
+_READY_ACTIVITY = Activity(
+    type=ActivityType.watching,
+    name="for /verify commands"
+)
+
+# Fire-and-forget tasks (welcome messages) - strong references until they finish
+_background_tasks: set = set()
+
+# Guilds where new members get the verification welcome (optional config.VERIFY_GUILD_IDS;
+# empty means every guild, matching the old behaviour)
+_VERIFY_GUILDS = frozenset(getattr(config, "VERIFY_GUILD_IDS", None) or ())
+
+# guild_id -> verify channel, resolved once and dropped when channels change
+_verify_channels: Dict[int, discord.abc.GuildChannel] = {}
+
+
+def _get_verify_channel(guild: discord.Guild) -> Optional[discord.abc.GuildChannel]:
+    """Cached lookup of config.VERIFY_CHANNEL_ID in a guild"""
+    channel = _verify_channels.get(guild.id)
+    if channel is None:
+        channel = guild.get_channel(config.VERIFY_CHANNEL_ID)
+        if channel is not None:
+            _verify_channels[guild.id] = channel
+    return channel
+
+
+# Pending welcome-message deletions: a min-heap of (due, channel_id, message_id)
+# drained by one sweeper task, instead of a sleeping delete_after task per message
+WELCOME_DELETE_AFTER = 300  # seconds
+_delete_heap: list = []
+_delete_wakeup = asyncio.Event()
+_delete_sweeper_task: Optional[asyncio.Task] = None
+
+
+def _schedule_delete(message: discord.Message, delay: float):
+    """Queue a message for deletion by the sweeper"""
+    heapq.heappush(_delete_heap, (time.monotonic() + delay, message.channel.id, message.id))
+    _delete_wakeup.set()
+
+
+async def _delete_sweeper():
+    """Sleep until the earliest pending deletion is due, then delete everything that is"""
+    while True:
+        if not _delete_heap:
+            await _delete_wakeup.wait()
+            _delete_wakeup.clear()
+            continue
+        
+        wait = _delete_heap[0][0] - time.monotonic()
+        if wait > 0:
+            try:
+                await asyncio.wait_for(_delete_wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            _delete_wakeup.clear()
+            continue
+        
+        now = time.monotonic()
+        due = []
+        while _delete_heap and _delete_heap[0][0] <= now:
+            due.append(heapq.heappop(_delete_heap))
+        results = await asyncio.gather(
+            *(bot.http.delete_message(channel_id, message_id) for _, channel_id, message_id in due),
+            return_exceptions=True
+        )
+        for result in results:
+            # Already deleted by a moderator is fine
+            if isinstance(result, Exception) and not isinstance(result, NotFound):
+                logger.warning("Failed to delete welcome message: %s", result)
+
+
+# Static part of the welcome message; each join copies it and adds the avatar
+_WELCOME_EMBED_TEMPLATE = Embed(
+    title="Welcome! 🎓",
+    description=config.WELCOME_MESSAGE,
+    color=config.EMBED_COLOR
+)
+_WELCOME_EMBED_TEMPLATE.set_footer(text="Use /verify to get started")
+
+# ============================================
+# COMMAND SYNC
+# ============================================
+# safe - sync only when the local command set changed since the last sync (default)
+# bulk - sync on every connect
+# off  - never sync automatically
+COMMAND_SYNC_POLICY = os.getenv("DISCORD_COMMAND_SYNC_POLICY", "safe").lower()
+COMMAND_SYNC_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".command_sync_cache")
+
+
+def _canonical_command(payload: dict) -> dict:
+    """Normalize fields Discord may echo back in a different shape"""
+    for key in ("integration_types", "contexts"):
+        if payload.get(key) is not None:
+            payload[key] = sorted(payload[key])
+    if payload.get("default_member_permissions") is not None:
+        payload["default_member_permissions"] = str(payload["default_member_permissions"])
+    return payload
+
+
+def _command_signature(tree: discord.app_commands.CommandTree) -> str:
+    """SHA-256 of the canonical JSON of every registered global command"""
+    payloads = sorted(
+        (_canonical_command(cmd.to_dict(tree)) for cmd in tree.get_commands()),
+        key=lambda p: (p.get("type", 1), p["name"])
+    )
+    # Tie the signature to the application so a token swap still triggers a sync
+    blob = json.dumps({"app": bot.application_id, "commands": payloads}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _read_sync_cache() -> Optional[str]:
+    try:
+        with open(COMMAND_SYNC_CACHE, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except (OSError, ValueError):  # missing, unreadable or not valid UTF-8 - just sync
+        return None
+
+
+def _write_sync_cache(signature: str):
+    try:
+        with open(COMMAND_SYNC_CACHE, "w", encoding="utf-8") as f:
+            f.write(signature)
+    except OSError as e:
+        logger.warning("Could not write command sync cache: %s", e)
+
+
+async def sync_commands():
+    """Sync slash commands according to DISCORD_COMMAND_SYNC_POLICY"""
+    if os.getenv("DISCORD_SKIP_SYNC") == "1":
+        logger.info("Skipping slash command sync (DISCORD_SKIP_SYNC=1)")
+        return
+    if COMMAND_SYNC_POLICY == "off":
+        logger.info("Command sync disabled (DISCORD_COMMAND_SYNC_POLICY=off)")
+        return
+    
+    try:
+        signature = _command_signature(bot.tree)
+    except Exception as e:
+        # e.g. a discord.py without Command.to_dict(tree) - sync every time rather than never
+        logger.warning("Could not compute slash command signature, syncing unconditionally: %s", e)
+        signature = None
+    if signature is not None and COMMAND_SYNC_POLICY != "bulk" and signature == _read_sync_cache():
+        logger.info("Slash commands unchanged since last sync - skipping")
+        return
+    
+    try:
+        # Global sync only (no guild=) - mixing in per-guild syncs shows duplicate commands
+        synced = await bot.tree.sync()
+        logger.info("Synced %d slash command(s)", len(synced))
+        if signature is not None:
+            _write_sync_cache(signature)
+    except Exception as e:
+        logger.error("Failed to sync commands: %s", e)
+
+
 # ============================================
 # EVENTS
 # ============================================
+def _guild_count() -> int:
+    """Number of cached guilds - reads the connection state's dict directly
+    instead of materializing the bot.guilds list just to take its length"""
+    return len(bot._connection._guilds)
+
+
 @bot.event
 async def on_ready():
     """Called when the bot successfully connects to Discord"""
-    logger.info(f"Bot logged in as {bot.user.name} (ID: {bot.user.id})")
-    logger.info(f"Connected to {len(bot.guilds)} guild(s)")
+    user = bot.user
+    guild_count = _guild_count()
+    logger.info("Bot logged in as %s (ID: %s)", user.name, user.id)
+    logger.info("Connected to %d guild(s)", guild_count)
     
-    # Set bot status
-    activity = discord.Activity(
-        type=discord.ActivityType.watching,
-        name="for /verify commands"
-    )
-    await bot.change_presence(activity=activity)
+    # Single background sweeper for welcome-message deletions (survives reconnects)
+    global _delete_sweeper_task
+    if _delete_sweeper_task is None or _delete_sweeper_task.done():
+        _delete_sweeper_task = asyncio.create_task(_delete_sweeper(), name="welcome-delete-sweeper")
     
-    # Sync slash commands
-    try:
-        synced = await bot.tree.sync()
-        logger.info(f"Synced {len(synced)} slash command(s)")
-    except Exception as e:
-        logger.error(f"Failed to sync commands: {e}")
+    # Resolve each guild's verify channel up front
+    _verify_channels.clear()
+    for guild in bot.guilds:
+        _get_verify_channel(guild)
     
-    print("=" * 50)
-    print(f"✅ Bot is ready!")
-    print(f"📌 Logged in as: {bot.user.name}")
-    print(f"🆔 Bot ID: {bot.user.id}")
-    print(f"🌐 Servers: {len(bot.guilds)}")
-    print("=" * 50)
+    # Presence update (gateway) and command sync (REST, skipped when nothing
+    # changed) are independent - run them concurrently
+    presence_result, sync_result = await asyncio.gather(
+        bot.change_presence(activity=_READY_ACTIVITY),
+        sync_commands(),
+        return_exceptions=True
+    )
+    if isinstance(presence_result, Exception):
+        logger.error("Failed to set presence: %s", presence_result)
+    if isinstance(sync_result, Exception):
+        logger.error("Failed to sync commands: %s", sync_result)
+    
+    # One write for the whole banner rather than a flush per line
+    banner = "\n".join((
+        "=" * 50,
+        "✅ Bot is ready!",
+        f"📌 Logged in as: {user.name}",
+        f"🆔 Bot ID: {user.id}",
+        f"🌐 Servers: {guild_count}",
+        "=" * 50,
+    ))
+    sys.stdout.write(banner + "\n")
+    sys.stdout.flush()
 
 
 @bot.event
 async def on_member_join(member: discord.Member):
     """Called when a new member joins the server"""
-    logger.info(f"New member joined: {member.name}#{member.discriminator} (ID: {member.id})")
+    if _VERIFY_GUILDS and member.guild.id not in _VERIFY_GUILDS:
+        return
+    
+    logger.info("New member joined: %s#%s (ID: %s)", member.name, member.discriminator, member.id)
     
     # Find the verify channel
-    verify_channel = member.guild.get_channel(config.VERIFY_CHANNEL_ID)
+    verify_channel = _get_verify_channel(member.guild)
+    
+    if not verify_channel:
+        return
     
-    if verify_channel:
+    async def _send_welcome():
         # Send welcome message (only visible in verify channel)
         try:
-            embed = discord.Embed(
-                title="Welcome! 🎓",
-                description=config.WELCOME_MESSAGE,
-                color=config.EMBED_COLOR
-            )
-            embed.set_thumbnail(url=member.avatar.url if member.avatar else None)
-            embed.set_footer(text="Use /verify to get started")
+            embed = _WELCOME_EMBED_TEMPLATE.copy()
+            embed.set_thumbnail(url=member.display_avatar.url)
             
-            await verify_channel.send(
+            message = await verify_channel.send(
                 content=f"Welcome {member.mention}!",
-                embed=embed,
-                delete_after=300  # Delete after 5 minutes
+                embed=embed
             )
-        except discord.Forbidden:
-            logger.warning(f"Cannot send welcome message - missing permissions")
+            _schedule_delete(message, WELCOME_DELETE_AFTER)  # Delete after 5 minutes
+        except Forbidden:
+            logger.warning("Cannot send welcome message - missing permissions")
+        except discord.HTTPException as e:
+            # Rate limit, Discord 5xx, or the channel vanished since it was looked up
+            logger.warning("Couldn't send welcome message to %s: %s", member.name, e)
+    
+    # Don't hold the join handler open for the REST round-trip; keep a reference
+    # so the task isn't garbage-collected before it finishes
+    task = asyncio.create_task(_send_welcome(), name=f"welcome-{member.id}")
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
 
 @bot.event
-async def on_command_error(ctx, error):
-    """Global error handler for commands"""
-    if isinstance(error, commands.CommandNotFound):
-        return  # Ignore command not found errors
-    
-    if isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send(f"❌ Missing required argument: `{error.param.name}`", ephemeral=True)
-        return
-    
-    if isinstance(error, commands.MissingPermissions):
-        await ctx.send("❌ You don't have permission to use this command.", ephemeral=True)
-        return
-    
+async def on_guild_channel_create(channel: discord.abc.GuildChannel):
+    _verify_channels.pop(channel.guild.id, None)
+
+
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    _verify_channels.pop(channel.guild.id, None)
+
+
+async def _handle_missing_arg(ctx, error):
+    await ctx.send(f"❌ Missing required argument: `{error.param.name}`", ephemeral=True)
+
+
+async def _handle_missing_perms(ctx, error):
+    await ctx.send("❌ You don't have permission to use this command.", ephemeral=True)
+
+
+async def _handle_unknown_error(ctx, error):
     # Log unexpected errors
-    logger.error(f"Command error: {error}", exc_info=True)
+    logger.error("Command error: %s", error, exc_info=True)
     await ctx.send("❌ An unexpected error occurred. Please try again later.", ephemeral=True)
 
 
+# Exact error type -> handler (None = ignore silently)
+_ERROR_HANDLERS = {
+    CommandNotFound: None,
+    MissingRequiredArgument: _handle_missing_arg,
+    MissingPermissions: _handle_missing_perms,
+}
+
+
+@bot.event
+async def on_command_error(ctx, error):
+    """Global error handler for commands"""
+    error_type = type(error)
+    if error_type in _ERROR_HANDLERS:
+        handler = _ERROR_HANDLERS[error_type]
+    else:
+        # Subclasses of the known errors still get their parent's handler
+        handler = next(
+            (h for t, h in _ERROR_HANDLERS.items() if isinstance(error, t)),
+            _handle_unknown_error
+        )
+    if handler is not None:
+        await handler(ctx, error)
+
+
 # ============================================
 # COG LOADING
 # ============================================
@@ -138,30 +437,51 @@ async def load_extensions():
         "src.cogs.help"
     ]
     
-    for cog in cogs:
+    async def _load(cog: str) -> bool:
         try:
             await bot.load_extension(cog)
-            logger.info(f"Loaded extension: {cog}")
+            return True
         except Exception as e:
-            logger.error(f"Failed to load {cog}: {e}")
+            logger.error("Failed to load %s: %s", cog, e)
+            return False
+    
+    # Cogs are independent - load them concurrently. Each load handles its own
+    # failure, so one broken cog doesn't cancel the rest of the group.
+    if hasattr(asyncio, "TaskGroup"):  # Python 3.11+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(_load(cog)) for cog in cogs]
+        results = [task.result() for task in tasks]
+    else:
+        results = await asyncio.gather(*(_load(cog) for cog in cogs))
+    
+    loaded = [cog for cog, ok in zip(cogs, results) if ok]
+    logger.info("Loaded %d extension(s): %s", len(loaded), ", ".join(loaded))
 
 
 # ============================================
 # MAIN ENTRY POINT
 # ============================================
-async def main():
+async def main(token: str):
     """Main function to run the bot"""
-    async with bot:
-        await load_extensions()
-        
-        token = os.getenv("DISCORD_TOKEN")
-        if not token:
-            logger.critical("DISCORD_TOKEN not found in environment variables!")
-            print("❌ ERROR: Please set DISCORD_TOKEN in your .env file")
-            return
-        
-        await bot.start(token)
+    try:
+        async with bot:
+            await load_extensions()
+            await bot.start(token)
+    finally:
+        # The connection pool is shared by every cog, so it is closed once the bot
+        # has shut down rather than when an individual cog unloads
+        await close_database()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Check the token before any event loop, HTTP session or database is set up
+    token = os.getenv("DISCORD_TOKEN")
+    if not token:
+        logger.critical("DISCORD_TOKEN not found in environment variables!")
+        print("❌ ERROR: Please set DISCORD_TOKEN in your .env file")
+        sys.exit(1)
+    
+    # libuv-based event loop: cheaper socket polling for the gateway + HTTP traffic
+    if uvloop is not None and sys.platform != "win32":
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(main(token))
@@ -0,0 +1,46 @@
+"""
+Stats Cache for Discord Mind Matrix Bot
+Short-lived in-process cache for the /stats aggregate queries
+"""
+
+import os
+import asyncio
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from database import db
+
+# Seconds a stats snapshot stays fresh - admin stats tolerate a little staleness
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", 30))
+
+_STATS_KEY = "verification_stats"
+
+_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_lock = asyncio.Lock()
+# Bumped by invalidate(); a refresh that started before a bump must not store its result
+_generation = 0
+
+
+async def get_stats() -> Dict[str, Any]:
+    """Return verification stats, hitting the database at most once per TTL"""
+    entry: Optional[Tuple[float, Dict[str, Any]]] = _cache.get(_STATS_KEY)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    
+    # Only one caller refreshes; the rest wait and reuse its result
+    async with _lock:
+        entry = _cache.get(_STATS_KEY)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        generation = _generation
+        stats = await db.get_verification_stats()
+        if generation == _generation:
+            _cache[_STATS_KEY] = (time.monotonic() + STATS_CACHE_TTL, stats)
+        return stats
+
+
+def invalidate():
+    """Drop the cached stats (call after any verify/unverify/add-student change)"""
+    global _generation
+    _generation += 1
+    _cache.pop(_STATS_KEY, None)
@@ -0,0 +1,45 @@
+"""
+Student Cache for Discord Mind Matrix Bot
+Bounded in-process TTL cache for student-by-email lookups (the roster rarely changes)
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from database import db, normalize_email
+
+# Seconds a cached student record stays fresh
+STUDENT_CACHE_TTL = float(os.getenv("STUDENT_CACHE_TTL", 3600))
+# Most records kept at once - least recently used are evicted first
+STUDENT_CACHE_SIZE = int(os.getenv("STUDENT_CACHE_SIZE", 10_000))
+
+_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+async def get_student_by_email(email: str) -> Optional[Dict[str, Any]]:
+    """Student record by email, hitting the database at most once per TTL (misses are not cached)"""
+    email = normalize_email(email)
+    entry = _cache.get(email)
+    if entry and entry[0] > time.monotonic():
+        _cache.move_to_end(email)
+        return entry[1]
+
+    student = await db.get_student_by_email(email)
+    if student is None:
+        _cache.pop(email, None)
+        return None
+    _cache[email] = (time.monotonic() + STUDENT_CACHE_TTL, student)
+    _cache.move_to_end(email)
+    if len(_cache) > STUDENT_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return student
+
+
+def invalidate(email: Optional[str] = None):
+    """Drop one cached student (or all of them) after the roster changes"""
+    if email is None:
+        _cache.clear()
+    else:
+        _cache.pop(normalize_email(email), None)
@@ -3,26 +3,134 @@ Admin Cog for Discord Mind Matrix Bot
 Provides administrative commands for managing students and verification
 """
 
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
 import logging
+import functools
 import csv
 import io
-from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict
 
 import config
 from database import db
+from src.cache import stats_cache, student_cache
 
 logger = logging.getLogger("admin")
 
+# Legacy course role IDs, for O(1) membership checks against a member's roles
+_COURSE_ROLE_IDS = frozenset(config.COURSE_ROLE_MAPPING.values())
+
+
+@functools.lru_cache(maxsize=2048)
+def _course_role_name(university: str, course: str) -> str:
+    """Course role name, e.g. VTU + Android App Development -> VTU-Android App Development Intern"""
+    return f"{university}-{course} Intern" if university else f"{course} Intern"
+
+
+@functools.lru_cache(maxsize=2048)
+def _batch_role_name(university: str, batch: str) -> str:
+    """Batch role name, e.g. VTU + Nomads -> VTU-Nomads"""
+    return f"{university}-{batch}" if university else batch
+
 
 class Admin(commands.Cog):
     """Administrative commands for bot management"""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # guild_id -> {role name: Role}, rebuilt lazily after any role change
+        self._role_name_cache: Dict[int, Dict[str, discord.Role]] = {}
+        # guild_id -> Verified role / {course name: legacy course role}, same invalidation
+        self._verified_role_cache: Dict[int, discord.Role] = {}
+        self._course_role_cache: Dict[int, Dict[str, discord.Role]] = {}
+        # Fixed header of the /stats embed; each call copies it and fills in the numbers
+        self._stats_embed_base = discord.Embed(
+            title="📊 Verification Statistics",
+            color=config.EMBED_COLOR
+        )
+    
+    # ============================================
+    # ROLE LOOKUP CACHE
+    # ============================================
+    def _roles_by_name(self, guild: discord.Guild) -> Dict[str, discord.Role]:
+        """Name -> Role map for a guild (built once instead of scanning guild.roles per lookup)"""
+        roles = self._role_name_cache.get(guild.id)
+        if roles is None:
+            roles = {role.name: role for role in guild.roles}
+            self._role_name_cache[guild.id] = roles
+        return roles
+    
+    def _get_verified_role(self, guild: discord.Guild) -> Optional[discord.Role]:
+        """The configured Verified role, resolved once per guild"""
+        role = self._verified_role_cache.get(guild.id)
+        if role is None and config.VERIFIED_ROLE_ID:
+            role = guild.get_role(config.VERIFIED_ROLE_ID)
+            if role:
+                self._verified_role_cache[guild.id] = role
+        return role
+    
+    def _get_legacy_course_roles(self, guild: discord.Guild) -> Dict[str, discord.Role]:
+        """config.COURSE_ROLE_MAPPING resolved to Role objects, once per guild"""
+        roles = self._course_role_cache.get(guild.id)
+        if roles is None:
+            roles = {}
+            for course_name, role_id in config.COURSE_ROLE_MAPPING.items():
+                role = guild.get_role(role_id)
+                if role:
+                    roles[course_name] = role
+            self._course_role_cache[guild.id] = roles
+        return roles
+    
+    def _invalidate_role_caches(self, guild_id: int):
+        """Drop every cached Role for a guild - they are rebuilt on next use"""
+        self._role_name_cache.pop(guild_id, None)
+        self._verified_role_cache.pop(guild_id, None)
+        self._course_role_cache.pop(guild_id, None)
+    
+    def _warm_role_cache(self):
+        """Build the role map for every guild up front so admin commands never start cold"""
+        for guild in self.bot.guilds:
+            self._roles_by_name(guild)
+    
+    async def cog_load(self):
+        """Warm the role cache (no-op before login - on_ready covers that case)"""
+        self._warm_role_cache()
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self._warm_role_cache()
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self._roles_by_name(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self._invalidate_role_caches(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self._invalidate_role_caches(role.guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self._invalidate_role_caches(role.guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        self._invalidate_role_caches(after.guild.id)
+    
+    async def _edit_roles(self, member: discord.Member, add: list = (), remove: list = (), reason: str = None):
+        """Apply role additions/removals with a single Modify Guild Member call"""
+        if not add and not remove:
+            return
+        remove_ids = {r.id for r in remove}
+        new_roles = [r for r in member.roles if not r.is_default() and r.id not in remove_ids]
+        kept_ids = {r.id for r in new_roles}
+        new_roles += [r for r in add if r.id not in kept_ids]
+        await member.edit(roles=new_roles, reason=reason)
     
     # ============================================
     # PERMISSION CHECK
@@ -43,13 +151,10 @@ class Admin(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            stats = await db.get_verification_stats()
+            stats = await stats_cache.get_stats()
             
-            embed = discord.Embed(
-                title="📊 Verification Statistics",
-                color=config.EMBED_COLOR,
-                timestamp=datetime.utcnow()
-            )
+            embed = self._stats_embed_base.copy()
+            embed.timestamp = discord.utils.utcnow()
             
             embed.add_field(
                 name="👥 Total Students",
@@ -86,7 +191,7 @@ class Admin(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             
         except Exception as e:
-            logger.error(f"Error fetching stats: {e}")
+            logger.error("Error fetching stats: %s", e)
             await interaction.followup.send("❌ Error fetching statistics.", ephemeral=True)
     
     # ============================================
@@ -109,89 +214,84 @@ class Admin(commands.Cog):
         
         email = email.strip().lower()
         
-        # Check if student exists in database
-        student = await db.get_student_by_email(email)
+        # Verify and fetch the student in one atomic step - two admins force-verifying
+        # the same email can't both succeed
+        student = await db.verify_student_atomic(email, user.id)
         
         if not student:
-            await interaction.followup.send(
-                f"❌ **Email not found in database**\n\n"
-                f"The email `{email}` is not registered.\n"
-                f"Please add the student first using `/add-student` or import via CSV.",
-                ephemeral=True
-            )
+            # Error path only: work out why the update matched nothing
+            existing = await db.get_student_by_email(email)
+            if not existing:
+                await interaction.followup.send(
+                    f"❌ **Email not found in database**\n\n"
+                    f"The email `{email}` is not registered.\n"
+                    f"Please add the student first using `/add-student` or import via CSV.",
+                    ephemeral=True
+                )
+            elif existing.get("is_verified") and existing.get("discord_id"):
+                await interaction.followup.send(
+                    f"⚠️ **Email already verified**\n\n"
+                    f"This email is linked to Discord ID: `{existing.get('discord_id')}`\n"
+                    f"Use `/unverify` first if you want to re-assign.",
+                    ephemeral=True
+                )
+            else:
+                await interaction.followup.send("❌ This Discord user might already be verified with another email.", ephemeral=True)
             return
         
-        # Get student info from database (new 5-column format with university)
+        # Student info from the verified record (new 5-column format with university)
         student_name = student.get("name", "Unknown")
         university = student.get("university", "")  # University (e.g., "VTU", "GTU")
         course = student.get("course", "")  # Category name (e.g., "Android App Development")
         batch = student.get("batch", "")    # Batch name (e.g., "Nomads")
         
-        # Check if email is already verified
-        if student.get("is_verified") and student.get("discord_id"):
-            existing_id = student.get("discord_id")
-            await interaction.followup.send(
-                f"⚠️ **Email already verified**\n\n"
-                f"This email is linked to Discord ID: `{existing_id}`\n"
-                f"Use `/unverify` first if you want to re-assign.",
-                ephemeral=True
-            )
-            return
-        
-        # Verify the student
-        verified = await db.verify_student(email, user.id)
-        
-        if not verified:
-            await interaction.followup.send("❌ This Discord user might already be verified with another email.", ephemeral=True)
-            return
+        stats_cache.invalidate()
+        student_cache.invalidate(email)
         
         # Assign roles (using new 5-column CSV structure with university prefix)
         roles_to_add = []
         role_names = []
         
         # 1. Add Verified role
-        if config.VERIFIED_ROLE_ID:
-            verified_role = interaction.guild.get_role(config.VERIFIED_ROLE_ID)
-            if verified_role:
-                roles_to_add.append(verified_role)
-                role_names.append(verified_role.name)
+        if verified_role := self._get_verified_role(interaction.guild):
+            roles_to_add.append(verified_role)
+            role_names.append(verified_role.name)
+        
+        # Role map is only needed when there is a course or batch role to resolve
+        roles_by_name = self._roles_by_name(interaction.guild) if course or batch else {}
         
         # 2. Handle Course role (Category-based) - now with university prefix
         # University = "VTU", Course = "Android App Development" → Role = "VTU-Android App Development Intern"
         if course:
-            if university:
-                course_role_name = f"{university}-{course} Intern"
-            else:
-                course_role_name = f"{course} Intern"
-            course_role = discord.utils.get(interaction.guild.roles, name=course_role_name)
-            if course_role:
+            course_role_name = _course_role_name(university, course)
+            if course_role := roles_by_name.get(course_role_name):
                 roles_to_add.append(course_role)
                 role_names.append(course_role.name)
             else:
-                logger.warning(f"Course role '{course_role_name}' not found. Run verification first to auto-create.")
+                logger.warning("Course role '%s' not found. Run verification first to auto-create.", course_role_name)
         
         # 3. Handle Batch role - now with university prefix
         # University = "VTU", Batch = "Nomads" → Role = "VTU-Nomads"
         if batch:
-            if university:
-                batch_role_name = f"{university}-{batch}"
-            else:
-                batch_role_name = batch
-            batch_role = discord.utils.get(interaction.guild.roles, name=batch_role_name)
-            if batch_role:
+            batch_role_name = _batch_role_name(university, batch)
+            if batch_role := roles_by_name.get(batch_role_name):
                 roles_to_add.append(batch_role)
                 role_names.append(batch_role.name)
             else:
-                logger.warning(f"Batch role '{batch_role_name}' not found. Run verification first to auto-create.")
-        
-        try:
-            if roles_to_add:
-                await user.add_roles(*roles_to_add, reason=f"Force verified by {interaction.user.name}")
-        except discord.Forbidden:
+                logger.warning("Batch role '%s' not found. Run verification first to auto-create.", batch_role_name)
+        
+        # Role PATCH and audit log are independent - run them together; a Forbidden
+        # on the roles must not cancel the log entry
+        role_result, _ = await asyncio.gather(
+            self._edit_roles(user, add=roles_to_add, reason=f"Force verified by {interaction.user.name}"),
+            db.log_verification_action(email, user.id, "FORCE_VERIFY", "SUCCESS", f"By admin: {interaction.user.name}"),
+            return_exceptions=True
+        )
+        if isinstance(role_result, discord.Forbidden):
             await interaction.followup.send("⚠️ Verified in DB but couldn't assign roles (missing permissions).", ephemeral=True)
             return
-        
-        await db.log_verification_action(email, user.id, "FORCE_VERIFY", "SUCCESS", f"By admin: {interaction.user.name}")
+        if isinstance(role_result, BaseException):
+            raise role_result
         
         embed = discord.Embed(
             title="✅ User Force Verified",
@@ -210,7 +310,7 @@ class Admin(commands.Cog):
         
         await interaction.followup.send(embed=embed, ephemeral=True)
         
-        logger.info(f"Force verified: {user.name} ({user.id}) with email {email} by admin {interaction.user.name}")
+        logger.info("Force verified: %s (%s) with email %s by admin %s", user.name, user.id, email, interaction.user.name)
     
     # ============================================
     # UNVERIFY COMMAND
@@ -258,6 +358,8 @@ class Admin(commands.Cog):
             if not user:
                 # User left the server but still in DB - just clear DB
                 await db.unverify_student(discord_id)
+                stats_cache.invalidate()
+                student_cache.invalidate(student.get("email"))
                 await interaction.followup.send(
                     f"✅ **Database cleared**\n\nEmail `{student.get('email')}` unverified.\n"
                     f"(User not in server, no roles to remove)",
@@ -270,55 +372,46 @@ class Admin(commands.Cog):
         course = student.get("course", "")  # Category name
         batch = student.get("batch", "")    # Batch name
         
-        # Remove from database
-        await db.unverify_student(user.id)
-        
-        # Remove ALL related roles
+        # Remove ALL related roles - membership tested against the member's role IDs
+        user_role_ids = {r.id for r in user.roles}
         roles_to_remove = []
         
         # 1. Remove Verified role
-        if config.VERIFIED_ROLE_ID:
-            verified_role = interaction.guild.get_role(config.VERIFIED_ROLE_ID)
-            if verified_role and verified_role in user.roles:
-                roles_to_remove.append(verified_role)
+        verified_role = self._get_verified_role(interaction.guild)
+        if verified_role and verified_role.id in user_role_ids:
+            roles_to_remove.append(verified_role)
         
         # 2. Remove legacy course roles from config.COURSE_ROLE_MAPPING
-        for course_name, role_id in config.COURSE_ROLE_MAPPING.items():
-            course_role = interaction.guild.get_role(role_id)
-            if course_role and course_role in user.roles:
-                roles_to_remove.append(course_role)
+        roles_to_remove.extend(r for r in user.roles if r.id in _COURSE_ROLE_IDS)
+        
+        roles_by_name = self._roles_by_name(interaction.guild) if course or batch else {}
         
         # 3. Remove Course Intern role (new 5-column format with university prefix)
         # University = "VTU", Course = "Android App Development" → Role = "VTU-Android App Development Intern"
-        if course:
-            if university:
-                course_role_name = f"{university}-{course} Intern"
-            else:
-                course_role_name = f"{course} Intern"
-            course_role = discord.utils.get(interaction.guild.roles, name=course_role_name)
-            if course_role and course_role in user.roles:
+        if course and (course_role := roles_by_name.get(_course_role_name(university, course))):
+            if course_role.id in user_role_ids:
                 roles_to_remove.append(course_role)
         
         # 4. Remove Batch role (new 5-column format with university prefix)
         # University = "VTU", Batch = "Nomads" → Role = "VTU-Nomads"
-        if batch:
-            if university:
-                batch_role_name = f"{university}-{batch}"
-            else:
-                batch_role_name = batch
-            batch_role = discord.utils.get(interaction.guild.roles, name=batch_role_name)
-            if batch_role and batch_role in user.roles:
+        if batch and (batch_role := roles_by_name.get(_batch_role_name(university, batch))):
+            if batch_role.id in user_role_ids:
                 roles_to_remove.append(batch_role)
         
         removed_role_names = [r.name for r in roles_to_remove]
         
-        try:
-            if roles_to_remove:
-                await user.remove_roles(*roles_to_remove, reason=f"Unverified by {interaction.user.name}")
-        except discord.Forbidden:
-            pass
-        
-        await db.log_verification_action(student.get("email"), user.id, "UNVERIFY", "SUCCESS", f"By admin: {interaction.user.name}, Roles removed: {removed_role_names}")
+        # DB update, role PATCH and audit log all run concurrently
+        db_result, role_result, _ = await asyncio.gather(
+            db.unverify_student(user.id),
+            self._edit_roles(user, remove=roles_to_remove, reason=f"Unverified by {interaction.user.name}"),
+            db.log_verification_action(student.get("email"), user.id, "UNVERIFY", "SUCCESS", f"By admin: {interaction.user.name}, Roles removed: {removed_role_names}"),
+            return_exceptions=True
+        )
+        stats_cache.invalidate()
+        student_cache.invalidate(student.get("email"))
+        for result in (db_result, role_result):
+            if isinstance(result, BaseException) and not isinstance(result, discord.Forbidden):
+                raise result
         
         embed = discord.Embed(
             title="🚫 User Unverified",
@@ -336,7 +429,7 @@ class Admin(commands.Cog):
             embed.add_field(name="Roles Removed", value=", ".join(removed_role_names), inline=False)
         
         await interaction.followup.send(embed=embed, ephemeral=True)
-        logger.info(f"Unverified: {user.name} ({user.id}) by admin {interaction.user.name}. Roles removed: {removed_role_names}")
+        logger.info("Unverified: %s (%s) by admin %s. Roles removed: %s", user.name, user.id, interaction.user.name, removed_role_names)
     
     # ============================================
     # LOOKUP COMMAND
@@ -431,6 +524,8 @@ class Admin(commands.Cog):
         )
         
         if success:
+            stats_cache.invalidate()
+            student_cache.invalidate(email)
             embed = discord.Embed(
                 title="✅ Student Added",
                 color=config.SUCCESS_COLOR
@@ -471,9 +566,9 @@ class Admin(commands.Cog):
         # Get target role
         target_role = None
         if course and course in config.COURSE_ROLE_MAPPING:
-            target_role = interaction.guild.get_role(config.COURSE_ROLE_MAPPING[course])
-        elif config.VERIFIED_ROLE_ID:
-            target_role = interaction.guild.get_role(config.VERIFIED_ROLE_ID)
+            target_role = self._get_legacy_course_roles(interaction.guild).get(course)
+        else:
+            target_role = self._get_verified_role(interaction.guild)
         
         if not target_role:
             await interaction.followup.send("❌ Could not find target role.", ephemeral=True)
@@ -484,7 +579,7 @@ class Admin(commands.Cog):
             title="📢 Announcement",
             description=message,
             color=config.EMBED_COLOR,
-            timestamp=datetime.utcnow()
+            timestamp=discord.utils.utcnow()
         )
         embed.set_footer(text=f"From: {interaction.user.name}")
         
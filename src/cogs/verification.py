@@ -18,35 +18,162 @@ Structure created per university:
 """
 
 import os
-import re
+import ssl
+import math
 import random
+import socket
+import secrets
 import string
+import time
 import logging
 import asyncio
-import itertools
-from datetime import datetime, timedelta
+import functools
+from typing import NamedTuple
+from email.header import Header
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import aiosmtplib
 from dotenv import load_dotenv
 
 import config
 from database import db, init_database
+from src.cache import stats_cache, student_cache
 
 load_dotenv()
 logger = logging.getLogger("verification")
 
+# OTP digits (config.OTP_LENGTH if set); modulus and zero-pad format precomputed for generate_otp
+_OTP_LENGTH = getattr(config, "OTP_LENGTH", 6)
+_OTP_MOD = 10 ** _OTP_LENGTH
+_OTP_FORMAT = f"0{_OTP_LENGTH}d"
+
+# Failures worth one reconnect + retry: the pooled connection died or the server stalled
+_TRANSIENT_SMTP_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+# ============================================
+# OTP EMAIL TEMPLATES
+# ============================================
+# Subject is constant, so its RFC 2047 encoding (needed for the emoji) is done once here
+_OTP_SUBJECT = Header("🔐 Your Discord Verification Code", "utf-8").encode()
+
+_OTP_TEXT_TEMPLATE = string.Template("""
+Hello $name,
+
+Your Discord verification code is: $otp
+
+This code will expire in 5 minutes.
+
+If you did not request this code, please ignore this email.
+
+Best regards,
+Mind Matrix Team
+""")
+
+_OTP_HTML_TEMPLATE = string.Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; background-color: #f4f4f4; padding: 20px; }
+        .container { max-width: 500px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .otp-code { font-size: 36px; font-weight: bold; color: #5865F2; letter-spacing: 8px; text-align: center; padding: 20px; background: #f0f0f0; border-radius: 8px; margin: 20px 0; }
+        .header { color: #333; text-align: center; }
+        .footer { color: #888; font-size: 12px; text-align: center; margin-top: 20px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h2 class="header">🔐 Discord Verification</h2>
+        <p>Hello <strong>$name</strong>,</p>
+        <p>Your verification code is:</p>
+        <div class="otp-code">$otp</div>
+        <p>This code will expire in <strong>5 minutes</strong>.</p>
+        <p>Enter this code using <code>/otp code:$otp</code> in Discord.</p>
+        <div class="footer">
+            <p>If you did not request this code, please ignore this email.</p>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+def _build_otp_message(sender: str, recipient: str, name: str, otp: str) -> MIMEMultipart:
+    """Build the plain-text + HTML OTP email (only the name and code vary per send)"""
+    message = MIMEMultipart("alternative")
+    message["Subject"] = _OTP_SUBJECT
+    message["From"] = sender
+    message["To"] = recipient
+    message.attach(MIMEText(_OTP_TEXT_TEMPLATE.substitute(name=name, otp=otp), "plain", "utf-8"))
+    message.attach(MIMEText(_OTP_HTML_TEMPLATE.substitute(name=name, otp=otp), "html", "utf-8"))
+    return message
+
+
+# ============================================
+# SHORT REPLY MESSAGES
+# ============================================
+# Refusals/errors that fit in one sentence go out as plain content instead of an embed
+_COOLDOWN_MESSAGE = "⏳ You can request another OTP in **{remaining}** seconds."
+_NO_PENDING_MESSAGE = "ℹ️ You don't have a pending verification. Use `/verify email:your@email.com` to start."
+_SEND_FAILED_MESSAGE = "❌ We couldn't send the verification email. Use `/reverify` to try again, or contact support if it keeps failing."
+
+
+class _ResendOutcome(NamedTuple):
+    """Result of one /reverify, shared with any duplicate request that arrived while it ran"""
+    ok: bool
+    email: str | None = None
+    error: str | None = None
+
+
+# ============================================
+# PERMISSION OVERWRITE TEMPLATES
+# ============================================
+# (allow, deny) pairs for the few overwrite shapes used on auto-created categories/channels,
+# built once so each create only wraps them with PermissionOverwrite.from_pair
+_OW_HIDDEN = (discord.Permissions.none(), discord.Permissions(view_channel=True))
+_OW_VIEW = (discord.Permissions(view_channel=True), discord.Permissions.none())
+_OW_MANAGE = (discord.Permissions(view_channel=True, manage_channels=True), discord.Permissions.none())
+_OW_READ_ONLY = (discord.Permissions(view_channel=True), discord.Permissions(send_messages=True))
+_OW_CHAT = (discord.Permissions(view_channel=True, send_messages=True), discord.Permissions.none())
+
+
+def _overwrite(pair: tuple[discord.Permissions, discord.Permissions]) -> discord.PermissionOverwrite:
+    """PermissionOverwrite from a prebuilt (allow, deny) template"""
+    return discord.PermissionOverwrite.from_pair(*pair)
+
+
+# ============================================
+# CHANNEL NAME HELPERS
+# ============================================
+_SPACE_TO_DASH = str.maketrans({" ": "-"})
+
+
+@functools.lru_cache(maxsize=512)
+def _slug(name: str) -> str:
+    """Channel-name form of a course/batch name, e.g. Android App Development -> android-app-development"""
+    return name.lower().translate(_SPACE_TO_DASH)
+
+
+@functools.lru_cache(maxsize=512)
+def _channel_prefix(university: str, course_name: str) -> str:
+    """Shared course channel prefix, e.g. VTU + Android App Development -> vtu-android-app-development"""
+    return f"{university.lower()}-{_slug(course_name)}" if university else _slug(course_name)
+
 
 class Verification(commands.Cog):
     """Cog for handling student email verification"""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.otp_cooldowns = {}
+        self.otp_cooldowns: dict[int, float] = {}  # user_id -> time.monotonic() when the cooldown ends
         
         # --- EMAIL SWITCHER CONFIG ---
         email_str = os.getenv("SMTP_EMAILS", "")
@@ -59,13 +186,72 @@ class Verification(commands.Cog):
         self.fallback_email = (os.getenv("SMTP_EMAIL") or "").strip().strip('"').strip("'")
         self.fallback_password = (os.getenv("SMTP_PASSWORD") or "").strip().strip('"').strip("'")
         
-        # Persistent counters for the current session
-        self.current_email_index = 0  # Which email are we using (0 to 7)
-        self.mail_counter = 0         # How many mails sent by CURRENT email
-        self.MAX_THRESHOLD = 1900     # Switch after 1900 emails
+        self.MAX_THRESHOLD = 1900     # Rest an account after 1900 emails
+        self.MAX_PENDING_SENDS = 32   # Background OTP emails in flight at once
+        self.SMTP_STATE_CHECKPOINT = 10  # Save account usage to the DB every N sends
+        self.SMTP_DNS_TTL = 3600      # Seconds to reuse the resolved SMTP host addresses
+        self.SMTP_IDLE_CHECK = 60     # NOOP-probe a pooled connection idle for longer than this
+        self._sends_since_checkpoint = 0
+        self.COOLDOWN_SWEEP_SIZE = 256  # Sweep expired cooldowns every time the dict reaches a multiple of this
+        
+        # Persistent SMTP connections, keyed by account index (-1 = SMTP_EMAIL fallback)
+        self.smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+        self.smtp_port = int(os.getenv("SMTP_PORT", 587))
+        self.smtp_timeout = float(os.getenv("SMTP_TIMEOUT", 15))  # Seconds per send attempt
+        self._smtp_clients: dict[int, aiosmtplib.SMTP] = {}
+        self._smtp_last_used: dict[int, float] = {}  # idx -> time.monotonic() of the last send
+        # New connections reuse one TLS context and the cached SMTP host addresses
+        # (the context loads the CA bundle from disk, so cog_load builds it off the event loop)
+        self._tls_context: ssl.SSLContext | None = None
+        self._smtp_addrs: list[tuple] = []
+        self._smtp_addrs_resolved_at = 0.0
+        self._smtp_next_addr = 0
         
-        if self.emails:
-            logger.info(f"🚀 Mail Switcher Ready: Starting with {self.emails[0]}")
+        # Account pool: one worker per SMTP_EMAILS account drains a shared send queue over that
+        # account's own connection; "count" is the account's usage toward MAX_THRESHOLD.
+        self._accounts: list[dict] = []
+        if self.emails and len(self.emails) == len(self.passwords):
+            self._accounts = [
+                {"idx": idx, "user": user, "password": password, "count": 0}
+                for idx, (user, password) in enumerate(zip(self.emails, self.passwords))
+            ]
+        self._send_queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_PENDING_SENDS)
+        self._smtp_workers: list[asyncio.Task] = []
+        self._quota_reset = asyncio.Event()  # Wakes resting workers once the pool's counters reset
+        self._fallback_lock = asyncio.Lock()
+        # Caps OTP emails being sent in the background after /verify has already replied
+        self._send_semaphore = asyncio.Semaphore(self.MAX_PENDING_SENDS)
+        
+        # Strong refs to fire-and-forget tasks (admin log posts) so they aren't GC'd mid-flight
+        self._background_tasks: set[asyncio.Task] = set()
+        # user_id -> the /reverify currently issuing that user's code; a double-submit awaits it
+        self._resend_inflight: dict[int, asyncio.Task] = {}
+        
+        # (guild_id, role name) -> role id; resolved through guild.get_role so role events
+        # never invalidate it (a renamed or deleted role just falls back to a scan)
+        self._role_ids: dict[tuple[int, str], int] = {}
+        # Roles we just created whose GUILD_ROLE_CREATE hasn't reached guild.get_role yet
+        self._created_roles: dict[int, discord.Role] = {}
+        # guild_id -> name-indexed categories, and category_id -> name-indexed text channels.
+        # Built lazily, updated on our own creates, and dropped on guild channel events.
+        self._category_cache: dict[int, dict[str, discord.CategoryChannel]] = {}
+        self._channel_cache: dict[int, dict[str, discord.TextChannel]] = {}
+        # (guild_id, role name) -> lock guarding creation of that course/batch's resources
+        self._resource_locks: dict[tuple[int, str], asyncio.Lock] = {}
+        
+        # Fixed header of the /otp success embed; each verification copies it and fills in the details
+        self._success_embed_base = discord.Embed(
+            title="✅ Verification Successful!",
+            color=config.SUCCESS_COLOR
+        )
+        # Same idea for the /reverify reply (short refusals and errors are plain-text _*_MESSAGE strings)
+        self._new_otp_embed_base = discord.Embed(title="📧 New OTP Sent!", color=config.EMBED_COLOR)
+        self._new_otp_embed_base.add_field(name="Next Step", value="Use `/otp code:XXXXXX` to complete verification.", inline=False)
+        
+        if self._accounts:
+            logger.info("🚀 Mail Switcher Ready: %s account(s) in the pool", len(self._accounts))
+        elif self.emails:
+            logger.warning("⚠️ SMTP_EMAILS/SMTP_PASSWORDS count mismatch — will use SMTP_EMAIL fallback only.")
         else:
             if self.fallback_email:
                 logger.warning("⚠️ SMTP_EMAILS not configured — will use SMTP_EMAIL fallback only.")
@@ -73,10 +259,147 @@ class Verification(commands.Cog):
                 logger.warning("⚠️ No SMTP_EMAILS/SMTP_EMAIL configured — OTP sending will fail until .env is set.")
         
     async def cog_load(self):
-        """Called when the cog is loaded - initialize database"""
+        """Called when the cog is loaded - initialize database and the SMTP pool"""
         await init_database()
+        await self._load_smtp_state()
+        self._tls_context = await asyncio.to_thread(ssl.create_default_context)
+        self._smtp_workers = [
+            asyncio.create_task(self._smtp_worker(account), name=f"smtp-worker-{account['idx']}")
+            for account in self._accounts
+        ]
+        self.purge_expired_otps.start()
         logger.info("Verification cog loaded and database initialized")
     
+    async def cog_unload(self):
+        """Called when the cog is unloaded - stop background tasks"""
+        self.purge_expired_otps.cancel()
+        for worker in self._smtp_workers:
+            worker.cancel()
+        # Let each worker resolve the job it was mid-way through before the clients close
+        await asyncio.gather(*self._smtp_workers, return_exceptions=True)
+        self._smtp_workers = []
+        # Anything still queued will never be sent - let its caller fall back instead of hanging
+        while not self._send_queue.empty():
+            *_, future = self._send_queue.get_nowait()
+            if not future.done():
+                future.set_result(False)
+        await self._save_smtp_state()
+        for idx in list(self._smtp_clients):
+            await self._close_smtp_client(idx)
+    
+    async def _load_smtp_state(self):
+        """Restore per-account send counts saved by a previous run"""
+        try:
+            saved = await db.get_smtp_state()
+        except Exception as e:
+            logger.error("Failed to load SMTP state: %s", e)
+            return
+        for account in self._accounts:
+            account["count"] = saved.get(account["user"], 0)
+        if saved:
+            logger.info("Restored SMTP usage: %s", {a["user"]: a["count"] for a in self._accounts})
+    
+    async def _save_smtp_state(self):
+        """Checkpoint per-account send counts to the database"""
+        self._sends_since_checkpoint = 0
+        try:
+            await db.set_smtp_state({a["user"]: a["count"] for a in self._accounts})
+        except Exception as e:
+            logger.error("Failed to save SMTP state: %s", e)
+    
+    # ============================================
+    # GUILD LOOKUP CACHE
+    # ============================================
+    def _get_role_by_name(self, guild: discord.Guild, name: str) -> discord.Role | None:
+        """Role by name via the cached id (O(1)); scans guild.roles only on a miss or stale entry"""
+        key = (guild.id, name)
+        role_id = self._role_ids.get(key)
+        role = (guild.get_role(role_id) or self._created_roles.get(role_id)) if role_id else None
+        if role is not None and role.name == name:
+            return role
+        role = discord.utils.get(guild.roles, name=name)
+        if role:
+            self._role_ids[key] = role.id
+        else:
+            self._role_ids.pop(key, None)
+        return role
+    
+    def _remember_created_role(self, role: discord.Role):
+        """Cache a role we created so it resolves before its gateway create event arrives"""
+        self._role_ids[(role.guild.id, role.name)] = role.id
+        self._created_roles[role.id] = role
+    
+    def _categories_by_name(self, guild: discord.Guild) -> dict[str, discord.CategoryChannel]:
+        """Name -> Category map for a guild"""
+        categories = self._category_cache.get(guild.id)
+        if categories is None:
+            categories = {}
+            for category in guild.categories:
+                categories.setdefault(category.name, category)
+            self._category_cache[guild.id] = categories
+        return categories
+    
+    def _channels_in(self, category: discord.CategoryChannel) -> dict[str, discord.TextChannel]:
+        """Name -> TextChannel map for one category (scans its few channels, not the whole guild)"""
+        channels = self._channel_cache.get(category.id)
+        if channels is None:
+            channels = {}
+            for channel in category.text_channels:
+                channels.setdefault(channel.name, channel)
+            self._channel_cache[category.id] = channels
+        return channels
+    
+    def _lock_for(self, key: tuple[int, str]) -> asyncio.Lock:
+        """Per-resource lock so concurrent verifications don't race to create the same role/channels"""
+        return self._resource_locks.setdefault(key, asyncio.Lock())
+    
+    def _invalidate_channel_caches(self, channel: discord.abc.GuildChannel):
+        """Drop the cached maps a created/deleted/moved channel belongs to"""
+        if isinstance(channel, discord.CategoryChannel):
+            self._category_cache.pop(channel.guild.id, None)
+            self._channel_cache.pop(channel.id, None)
+        elif channel.category_id is not None:
+            self._channel_cache.pop(channel.category_id, None)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self._role_ids = {key: rid for key, rid in self._role_ids.items() if key[0] != guild.id}
+        self._category_cache.pop(guild.id, None)
+        for category in guild.categories:
+            self._channel_cache.pop(category.id, None)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self._created_roles.pop(role.id, None)  # guild.get_role has it now
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self._created_roles.pop(role.id, None)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self._invalidate_channel_caches(channel)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self._invalidate_channel_caches(channel)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if before.name != after.name or before.category_id != after.category_id:
+            self._invalidate_channel_caches(before)
+            self._invalidate_channel_caches(after)
+    
+    @tasks.loop(minutes=10)
+    async def purge_expired_otps(self):
+        """Periodically sweep expired OTP codes out of the database"""
+        try:
+            removed = await db.purge_expired_otps()
+            if removed:
+                logger.info("Purged %s expired OTP code(s)", removed)
+        except Exception as e:
+            logger.error("Failed to purge expired OTPs: %s", e)
+    
     # ============================================
     # HELPER: AUTO-CREATE COURSE RESOURCES (Category + Shared Channels)
     # ============================================
@@ -102,89 +425,112 @@ class Verification(commands.Cog):
         if university:
             course_role_name = f"{university}-{course_name} Intern"
             category_name = f"{university} - {course_name}"
-            channel_prefix = f"{university.lower()}-{course_name.lower().replace(' ', '-')}"
         else:
             course_role_name = f"{course_name} Intern"
             category_name = course_name
-            channel_prefix = course_name.lower().replace(" ", "-")
-        
-        # 1. Get or Create COURSE ROLE
-        course_role = discord.utils.get(guild.roles, name=course_role_name)
-        if not course_role:
-            try:
-                course_role = await guild.create_role(
-                    name=course_role_name,
-                    mentionable=True,
-                    reason=f"Auto-created by Mind Matrix Bot for {university} - {course_name}" if university else f"Auto-created by Mind Matrix Bot for {course_name}"
-                )
-                logger.info(f"✅ Created Course Role: {course_role_name}")
-            except discord.Forbidden:
-                logger.error(f"❌ Missing Permissions: Cannot create role '{course_role_name}'")
-                return (None, None)
-        
-        # 2. Get or Create CATEGORY
-        category = discord.utils.get(guild.categories, name=category_name)
-        if not category:
-            try:
-                # Category permissions: Hidden from @everyone, visible to Course Role
-                overwrites = {
-                    guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                    course_role: discord.PermissionOverwrite(view_channel=True),
-                    guild.me: discord.PermissionOverwrite(view_channel=True, manage_channels=True)
-                }
-                category = await guild.create_category(
-                    name=category_name,
-                    overwrites=overwrites,
-                    reason=f"Auto-created by Mind Matrix Bot for {university} - {course_name}" if university else f"Auto-created by Mind Matrix Bot for {course_name}"
-                )
-                logger.info(f"✅ Created Category: {category_name}")
-            except discord.Forbidden:
-                logger.error(f"❌ Missing Permissions: Cannot create category '{category_name}'")
-                return (course_role, None)
-        
-        # 3. Create SHARED CHANNELS inside the Category
+        channel_prefix = _channel_prefix(university, course_name)
         announcement_channel_name = f"announcements-{channel_prefix}"
         discussion_channel_name = f"discussions-{channel_prefix}"
         
-        # 3a. Announcements Channel (Students can view, only Admin can send)
-        announcement_channel = discord.utils.get(guild.text_channels, name=announcement_channel_name, category=category)
-        if not announcement_channel:
-            try:
-                announcement_overwrites = {
-                    guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                    course_role: discord.PermissionOverwrite(view_channel=True, send_messages=False),  # Read-only
-                    guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True)
-                }
-                await guild.create_text_channel(
-                    name=announcement_channel_name,
-                    category=category,
-                    overwrites=announcement_overwrites,
-                    topic=f"📢 Official announcements for {university} - {course_name}. Only admins can post." if university else f"📢 Official announcements for {course_name}. Only admins can post."
-                )
-                logger.info(f"✅ Created Channel: #{announcement_channel_name}")
-            except discord.Forbidden:
-                logger.error(f"❌ Missing Permissions: Cannot create channel '{announcement_channel_name}'")
+        # Common case: everything already exists - answer from the caches without locking
+        # or building any permission overwrites
+        course_role = self._get_role_by_name(guild, course_role_name)
+        category = self._categories_by_name(guild).get(category_name)
+        if course_role and category:
+            channels = self._channels_in(category)
+            if announcement_channel_name in channels and discussion_channel_name in channels:
+                return (course_role, category)
         
-        # 3b. Discussion Channel (All students can chat)
-        discussion_channel = discord.utils.get(guild.text_channels, name=discussion_channel_name, category=category)
-        if not discussion_channel:
-            try:
-                discussion_overwrites = {
-                    guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                    course_role: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-                    guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True)
-                }
-                await guild.create_text_channel(
-                    name=discussion_channel_name,
-                    category=category,
-                    overwrites=discussion_overwrites,
-                    topic=f"💬 Discussion forum for all {university} - {course_name} students" if university else f"💬 Discussion forum for all {course_name} students"
-                )
-                logger.info(f"✅ Created Channel: #{discussion_channel_name}")
-            except discord.Forbidden:
-                logger.error(f"❌ Missing Permissions: Cannot create channel '{discussion_channel_name}'")
-        
-        return (course_role, category)
+        # Serialize per course so concurrent /otp calls create each resource once;
+        # later waiters find everything in the caches the first caller filled
+        async with self._lock_for((guild.id, course_role_name)):
+            # 1. Get or Create COURSE ROLE
+            course_role = self._get_role_by_name(guild, course_role_name)
+            if not course_role:
+                try:
+                    course_role = await guild.create_role(
+                        name=course_role_name,
+                        mentionable=True,
+                        reason=f"Auto-created by Mind Matrix Bot for {university} - {course_name}" if university else f"Auto-created by Mind Matrix Bot for {course_name}"
+                    )
+                    self._remember_created_role(course_role)
+                    logger.info("✅ Created Course Role: %s", course_role_name)
+                except discord.Forbidden:
+                    logger.error("❌ Missing Permissions: Cannot create role '%s'", course_role_name)
+                    return (None, None)
+            
+            # 2. Get or Create CATEGORY
+            category = self._categories_by_name(guild).get(category_name)
+            if not category:
+                try:
+                    # Category permissions: Hidden from @everyone, visible to Course Role
+                    overwrites = {
+                        guild.default_role: _overwrite(_OW_HIDDEN),
+                        course_role: _overwrite(_OW_VIEW),
+                        guild.me: _overwrite(_OW_MANAGE)
+                    }
+                    category = await guild.create_category(
+                        name=category_name,
+                        overwrites=overwrites,
+                        reason=f"Auto-created by Mind Matrix Bot for {university} - {course_name}" if university else f"Auto-created by Mind Matrix Bot for {course_name}"
+                    )
+                    self._categories_by_name(guild)[category_name] = category
+                    self._channel_cache[category.id] = {}  # Brand new - nothing to scan
+                    logger.info("✅ Created Category: %s", category_name)
+                except discord.Forbidden:
+                    logger.error("❌ Missing Permissions: Cannot create category '%s'", category_name)
+                    return (course_role, None)
+            
+            # 3. Create SHARED CHANNELS inside the Category
+            # 3a. Announcements Channel (Students can view, only Admin can send)
+            async def create_announcements():
+                if announcement_channel_name in self._channels_in(category):
+                    return
+                try:
+                    announcement_overwrites = {
+                        guild.default_role: _overwrite(_OW_HIDDEN),
+                        course_role: _overwrite(_OW_READ_ONLY),  # Read-only
+                        guild.me: _overwrite(_OW_CHAT)
+                    }
+                    channel = await guild.create_text_channel(
+                        name=announcement_channel_name,
+                        category=category,
+                        overwrites=announcement_overwrites,
+                        topic=f"📢 Official announcements for {university} - {course_name}. Only admins can post." if university else f"📢 Official announcements for {course_name}. Only admins can post."
+                    )
+                    self._channels_in(category)[announcement_channel_name] = channel
+                    logger.info("✅ Created Channel: #%s", announcement_channel_name)
+                except discord.Forbidden:
+                    logger.error("❌ Missing Permissions: Cannot create channel '%s'", announcement_channel_name)
+            
+            # 3b. Discussion Channel (All students can chat)
+            async def create_discussions():
+                if discussion_channel_name in self._channels_in(category):
+                    return
+                try:
+                    discussion_overwrites = {
+                        guild.default_role: _overwrite(_OW_HIDDEN),
+                        course_role: _overwrite(_OW_CHAT),
+                        guild.me: _overwrite(_OW_CHAT)
+                    }
+                    channel = await guild.create_text_channel(
+                        name=discussion_channel_name,
+                        category=category,
+                        overwrites=discussion_overwrites,
+                        topic=f"💬 Discussion forum for all {university} - {course_name} students" if university else f"💬 Discussion forum for all {course_name} students"
+                    )
+                    self._channels_in(category)[discussion_channel_name] = channel
+                    logger.info("✅ Created Channel: #%s", discussion_channel_name)
+                except discord.Forbidden:
+                    logger.error("❌ Missing Permissions: Cannot create channel '%s'", discussion_channel_name)
+            
+            # The two channels are independent - create them concurrently
+            results = await asyncio.gather(create_announcements(), create_discussions(), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error("❌ Failed to create course channel for '%s': %s", category_name, result)
+            
+            return (course_role, category)
     
     # ============================================
     # HELPER: AUTO-CREATE BATCH RESOURCES (Batch Role + Private Channel)
@@ -208,159 +554,296 @@ class Verification(commands.Cog):
         # Build names with university prefix if provided
         if university:
             batch_role_name = f"{university}-{batch_name}"
-            channel_name = f"{university.lower()}-{batch_name.lower().replace(' ', '-')}-official"
+            channel_name = f"{university.lower()}-{_slug(batch_name)}-official"
         else:
             batch_role_name = batch_name
-            channel_name = f"{batch_name.lower().replace(' ', '-')}-official"
+            channel_name = f"{_slug(batch_name)}-official"
         
-        # 1. Get or Create BATCH ROLE
-        batch_role = discord.utils.get(guild.roles, name=batch_role_name)
-        if not batch_role:
-            try:
-                batch_role = await guild.create_role(
-                    name=batch_role_name,
-                    mentionable=True,
-                    reason=f"Auto-created by Mind Matrix Bot for {university} batch {batch_name}" if university else f"Auto-created by Mind Matrix Bot for batch {batch_name}"
-                )
-                logger.info(f"✅ Created Batch Role: {batch_role_name}")
-            except discord.Forbidden:
-                logger.error(f"❌ Missing Permissions: Cannot create role '{batch_role_name}'")
-                return None
-        
-        # 2. Get or Create BATCH-SPECIFIC CHANNEL
-        batch_channel = discord.utils.get(guild.text_channels, name=channel_name)
-        
-        if not batch_channel and category:
-            try:
-                # Channel visible only to this specific batch
-                overwrites = {
-                    guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                    batch_role: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-                    guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True)
-                }
-                await guild.create_text_channel(
-                    name=channel_name,
-                    category=category,
-                    overwrites=overwrites,
-                    topic=f"🔒 Private channel for {university} - {batch_name} batch only" if university else f"🔒 Private channel for {batch_name} batch only"
-                )
-                logger.info(f"✅ Created Batch Channel: #{channel_name}")
-            except discord.Forbidden:
-                logger.error(f"❌ Missing Permissions: Cannot create channel '{channel_name}'")
+        # Common case: role (and channel, when there is a category) already exist
+        batch_role = self._get_role_by_name(guild, batch_role_name)
+        if batch_role and (not category or channel_name in self._channels_in(category)):
+            return batch_role
         
-        return batch_role
+        async with self._lock_for((guild.id, batch_role_name)):
+            # 1. Get or Create BATCH ROLE
+            batch_role = self._get_role_by_name(guild, batch_role_name)
+            if not batch_role:
+                try:
+                    batch_role = await guild.create_role(
+                        name=batch_role_name,
+                        mentionable=True,
+                        reason=f"Auto-created by Mind Matrix Bot for {university} batch {batch_name}" if university else f"Auto-created by Mind Matrix Bot for batch {batch_name}"
+                    )
+                    self._remember_created_role(batch_role)
+                    logger.info("✅ Created Batch Role: %s", batch_role_name)
+                except discord.Forbidden:
+                    logger.error("❌ Missing Permissions: Cannot create role '%s'", batch_role_name)
+                    return None
+            
+            # 2. Get or Create BATCH-SPECIFIC CHANNEL
+            batch_channel = self._channels_in(category).get(channel_name) if category else None
+            
+            if not batch_channel and category:
+                try:
+                    # Channel visible only to this specific batch
+                    overwrites = {
+                        guild.default_role: _overwrite(_OW_HIDDEN),
+                        batch_role: _overwrite(_OW_CHAT),
+                        guild.me: _overwrite(_OW_CHAT)
+                    }
+                    batch_channel = await guild.create_text_channel(
+                        name=channel_name,
+                        category=category,
+                        overwrites=overwrites,
+                        topic=f"🔒 Private channel for {university} - {batch_name} batch only" if university else f"🔒 Private channel for {batch_name} batch only"
+                    )
+                    self._channels_in(category)[channel_name] = batch_channel
+                    logger.info("✅ Created Batch Channel: #%s", channel_name)
+                except discord.Forbidden:
+                    logger.error("❌ Missing Permissions: Cannot create channel '%s'", channel_name)
+            
+            return batch_role
     
     # ============================================
     # UTILITY FUNCTIONS
     # ============================================
-    def generate_otp(self, length: int = 6) -> str:
-        """Generate a random numeric OTP code"""
-        return ''.join(random.choices(string.digits, k=length))
+    def _run_in_background(self, coro) -> asyncio.Task:
+        """Schedule a fire-and-forget coroutine, keeping a strong ref until it finishes"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
     
-    async def send_otp_email(self, email: str, otp: str, name: str = "Student") -> bool:
-        """Send OTP preferring SMTP_EMAILS; fallback to SMTP_EMAIL on failure."""
-        smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
-        smtp_port = int(os.getenv("SMTP_PORT", 587))
-
-        async def _send_with(username: str, password: str) -> None:
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = "🔐 Your Discord Verification Code"
-            message["From"] = username
-            message["To"] = email
-
-            # Plain text version
-            text = f"""
-Hello {name},
-
-Your Discord verification code is: {otp}
-
-This code will expire in 5 minutes.
-
-If you did not request this code, please ignore this email.
-
-Best regards,
-Mind Matrix Team
-            """
-
-            # HTML version
-            html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: Arial, sans-serif; background-color: #f4f4f4; padding: 20px; }}
-        .container {{ max-width: 500px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .otp-code {{ font-size: 36px; font-weight: bold; color: #5865F2; letter-spacing: 8px; text-align: center; padding: 20px; background: #f0f0f0; border-radius: 8px; margin: 20px 0; }}
-        .header {{ color: #333; text-align: center; }}
-        .footer {{ color: #888; font-size: 12px; text-align: center; margin-top: 20px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h2 class="header">🔐 Discord Verification</h2>
-        <p>Hello <strong>{name}</strong>,</p>
-        <p>Your verification code is:</p>
-        <div class="otp-code">{otp}</div>
-        <p>This code will expire in <strong>5 minutes</strong>.</p>
-        <p>Enter this code using <code>/otp code:{otp}</code> in Discord.</p>
-        <div class="footer">
-            <p>If you did not request this code, please ignore this email.</p>
-        </div>
-    </div>
-</body>
-</html>
-            """
-
-            message.attach(MIMEText(text, "plain"))
-            message.attach(MIMEText(html, "html"))
-
-            await aiosmtplib.send(
-                message,
-                hostname=smtp_host,
-                port=smtp_port,
-                username=username,
-                password=password,
-                start_tls=True
+    async def _send_otp_in_background(self, interaction: discord.Interaction, email: str, otp: str, name: str):
+        """Send the OTP after /verify has replied; on failure lift the cooldown and tell the user"""
+        user_id = interaction.user.id
+        try:
+            async with self._send_semaphore:
+                email_sent = await self.send_otp_email(email, otp, name)
+        except Exception as e:
+            logger.error("Unexpected error sending OTP to %s: %s", email, e)
+            email_sent = False
+        
+        if email_sent:
+            await db.log_verification_action(email, user_id, "OTP_SENT", "SUCCESS")
+            return
+        
+        # The code never arrived - lift both cooldowns but keep the pending row, so /reverify
+        # can issue a fresh code right away (using the student_name stored with it)
+        self.otp_cooldowns.pop(user_id, None)
+        await asyncio.gather(
+            db.release_otp_cooldown(user_id, otp),
+            db.log_verification_action(email, user_id, "OTP_SENT", "FAILED", "Email send failed"),
+            return_exceptions=True
+        )
+        try:
+            # Interaction followups stay valid for 15 minutes, well past any SMTP timeout
+            await interaction.followup.send(_SEND_FAILED_MESSAGE, ephemeral=True)
+        except discord.HTTPException as e:
+            logger.warning("Couldn't report failed OTP email to %s: %s", interaction.user.name, e)
+    
+    def _make_success_embed(self, user: discord.Member, email: str, university: str, course: str, batch: str,
+                            assigned_roles: list, role_assignment_errors: list) -> discord.Embed:
+        """Fill a copy of the prebuilt success embed with this student's details"""
+        embed = self._success_embed_base.copy()
+        embed.description = config.VERIFICATION_SUCCESS.format(username=user.display_name)
+        embed.add_field(name="Email", value=email, inline=True)
+        if university:
+            embed.add_field(name="University", value=university, inline=True)
+        embed.add_field(name="Course", value=course or "N/A", inline=True)
+        if batch:
+            embed.add_field(name="Batch", value=batch, inline=True)
+        
+        # Show assigned roles
+        if assigned_roles:
+            embed.add_field(name="Roles Assigned", value=", ".join(assigned_roles), inline=False)
+        
+        # Warn user if there were any role assignment issues
+        if role_assignment_errors:
+            embed.add_field(
+                name="⚠️ Notice", 
+                value="Some roles couldn't be assigned. Contact an admin if you can't access your course channels.",
+                inline=False
             )
+        
+        embed.set_thumbnail(url=user.avatar.url if user.avatar else None)
+        return embed
+    
+    async def _post_admin_log(self, log_channel: discord.abc.Messageable, embed: discord.Embed):
+        """Send an embed to the admin log channel, logging (not raising) failures"""
+        try:
+            await log_channel.send(embed=embed)
+        except Exception as e:
+            logger.error("Failed to send log message: %s", e)
+    
+    def generate_otp(self) -> str:
+        """Generate a cryptographically random numeric OTP code"""
+        return format(secrets.randbelow(_OTP_MOD), _OTP_FORMAT)
+    
+    async def _resolve_smtp_host(self):
+        """Resolve the SMTP host once per SMTP_DNS_TTL instead of on every new connection"""
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(self.smtp_host, self.smtp_port, type=socket.SOCK_STREAM)
+        self._smtp_addrs = [(family, type_, proto, sockaddr) for family, type_, proto, _, sockaddr in infos]
+        self._smtp_addrs_resolved_at = time.monotonic()
+    
+    async def _open_smtp_socket(self) -> socket.socket:
+        """Open a TCP connection to the SMTP host, rotating round-robin over its cached addresses"""
+        if not self._smtp_addrs or time.monotonic() - self._smtp_addrs_resolved_at > self.SMTP_DNS_TTL:
+            await self._resolve_smtp_host()
+        addrs = self._smtp_addrs
+        start = self._smtp_next_addr
+        self._smtp_next_addr += 1
+        
+        # Try each address once, starting from this connection's turn
+        for i in range(len(addrs)):
+            family, type_, proto, sockaddr = addrs[(start + i) % len(addrs)]
+            sock = socket.socket(family, type_, proto)
+            sock.setblocking(False)
+            try:
+                await asyncio.get_running_loop().sock_connect(sock, sockaddr)
+                return sock
+            except OSError as e:
+                sock.close()
+                last_error = e
+            except BaseException:
+                sock.close()
+                raise
+        self._smtp_addrs = []  # Every cached address failed - resolve again next time
+        raise last_error
+    
+    async def _get_smtp_client(self, idx: int, username: str, password: str) -> aiosmtplib.SMTP:
+        """Return a connected, logged-in SMTP client for the account, opening one if needed"""
+        client = self._smtp_clients.get(idx)
+        now = time.monotonic()
+        if client is not None and client.is_connected and now - self._smtp_last_used.get(idx, now) > self.SMTP_IDLE_CHECK:
+            # Servers silently drop idle sessions - probe with NOOP rather than fail the real send
+            try:
+                await client.noop()
+            except Exception:
+                await self._close_smtp_client(idx)
+                client = None
+        if client is None or not client.is_connected:
+            # Connect to a cached address ourselves; hostname stays the real host for STARTTLS SNI/cert checks
+            sock = await self._open_smtp_socket()
+            client = aiosmtplib.SMTP(
+                hostname=self.smtp_host, sock=sock, start_tls=True,
+                timeout=self.smtp_timeout, tls_context=self._tls_context
+            )
+            await client.connect()
+            await client.login(username, password)
+            self._smtp_clients[idx] = client
+        self._smtp_last_used[idx] = now
+        return client
+    
+    async def _close_smtp_client(self, idx: int) -> None:
+        """Drop the pooled SMTP connection for an account, ignoring errors on a dead socket"""
+        client = self._smtp_clients.pop(idx, None)
+        if client is None:
+            return
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+    
+    async def _send_with(self, idx: int, username: str, password: str, email: str, otp: str, name: str) -> None:
+        """Deliver one OTP email over the account's pooled connection"""
+        # MIME encoding is pure CPU work - keep it off the event loop
+        message = await asyncio.to_thread(_build_otp_message, username, email, name, otp)
 
-        list_config_ok = bool(self.emails) and bool(self.passwords) and (len(self.emails) == len(self.passwords))
-
-        # 1) Prefer SMTP_EMAILS (threshold-based)
-        if list_config_ok:
-            # Check if we need to switch to the next email
-            if self.mail_counter >= self.MAX_THRESHOLD:
-                self.current_email_index += 1
-                self.mail_counter = 0
-
-                if self.current_email_index >= len(self.emails):
-                    self.current_email_index = 0
-
-                logger.info(
-                    f"🔄 Limit reached! Switching to email #{self.current_email_index + 1}: {self.emails[self.current_email_index]}"
-                )
-
-            current_user = self.emails[self.current_email_index]
-            current_pass = self.passwords[self.current_email_index]
+        async def _deliver():
+            client = await self._get_smtp_client(idx, username, password)
+            await client.send_message(message)
 
+        # Reuse the account's open connection. Each attempt is bounded so a hung socket can't
+        # stall the caller; a dropped/timed-out connection is reopened and retried once after
+        # a short jittered pause, anything else (auth, refused recipient) fails straight away
+        for attempt in range(2):
             try:
-                await _send_with(current_user, current_pass)
-                self.mail_counter += 1
-                logger.info(f"✅ OTP sent to {email} | {current_user} usage: {self.mail_counter}/{self.MAX_THRESHOLD}")
-                return True
+                await asyncio.wait_for(_deliver(), timeout=self.smtp_timeout)
+                return
+            except _TRANSIENT_SMTP_ERRORS:
+                await self._close_smtp_client(idx)
+                if attempt:
+                    raise
+                await asyncio.sleep(random.uniform(0.1, 0.5))
+            except Exception:
+                await self._close_smtp_client(idx)
+                raise
+    
+    async def _wait_for_quota(self, account: dict):
+        """Park a worker whose account hit MAX_THRESHOLD until every account has, then reset them all"""
+        if all(a["count"] >= self.MAX_THRESHOLD for a in self._accounts):
+            # Every account is used up - start a new round, like the old switcher wrapping back to #1
+            logger.info("🔄 Limit reached on every SMTP account — resetting usage counters")
+            for a in self._accounts:
+                a["count"] = 0
+            reset, self._quota_reset = self._quota_reset, asyncio.Event()
+            reset.set()
+            return
+        # Resting until the pool resets - don't hold its connection open meanwhile
+        await self._close_smtp_client(account["idx"])
+        await self._quota_reset.wait()
+    
+    async def _warm_smtp(self, account: dict):
+        """Resolve the host and log the account in at startup so the first OTP skips that latency"""
+        try:
+            await asyncio.wait_for(
+                self._get_smtp_client(account["idx"], account["user"], account["password"]),
+                self.smtp_timeout
+            )
+        except Exception as e:
+            # Not fatal - the first real send connects (and retries) on its own
+            await self._close_smtp_client(account["idx"])
+            logger.warning("⚠️ Couldn't pre-connect SMTP account %s: %s", account["user"], e)
+    
+    async def _smtp_worker(self, account: dict):
+        """Deliver queued OTP emails with one SMTP_EMAILS account; it alone uses that connection"""
+        await self._warm_smtp(account)
+        while True:
+            while account["count"] >= self.MAX_THRESHOLD:
+                await self._wait_for_quota(account)
+            email, otp, name, future = await self._send_queue.get()
+            try:
+                await self._send_with(account["idx"], account["user"], account["password"], email, otp, name)
             except Exception as e:
-                logger.error(f"❌ SMTP_EMAILS send failed using {current_user}: {e}")
+                logger.error("❌ SMTP_EMAILS send failed using %s: %s", account["user"], e)
+                if not future.done():
+                    future.set_result(False)
+            else:
+                account["count"] += 1
+                logger.info("✅ OTP sent to %s | %s usage: %s/%s", email, account["user"], account["count"], self.MAX_THRESHOLD)
+                if not future.done():
+                    future.set_result(True)
+                self._sends_since_checkpoint += 1
+                if self._sends_since_checkpoint >= self.SMTP_STATE_CHECKPOINT:
+                    await self._save_smtp_state()
+            finally:
+                # Cancelled mid-send (cog unload) - the caller falls back instead of awaiting forever
+                if not future.done():
+                    future.set_result(False)
+                self._send_queue.task_done()
+    
+    async def send_otp_email(self, email: str, otp: str, name: str = "Student") -> bool:
+        """Send OTP preferring SMTP_EMAILS; fallback to SMTP_EMAIL on failure."""
+        # 1) Prefer the SMTP_EMAILS pool - whichever account worker is free picks it up
+        if self._smtp_workers:
+            future = asyncio.get_running_loop().create_future()
+            await self._send_queue.put((email, otp, name, future))
+            if await future:
+                return True
         else:
             logger.warning("⚠️ SMTP_EMAILS/SMTP_PASSWORDS missing or mismatch — attempting SMTP_EMAIL fallback.")
 
         # 2) Fallback: SMTP_EMAIL (only if configured)
         if self.fallback_email and self.fallback_password:
             try:
-                await _send_with(self.fallback_email, self.fallback_password)
-                logger.info(f"✅ OTP sent to {email} | fallback {self.fallback_email}")
+                async with self._fallback_lock:
+                    await self._send_with(-1, self.fallback_email, self.fallback_password, email, otp, name)
+                logger.info("✅ OTP sent to %s | fallback %s", email, self.fallback_email)
                 return True
             except Exception as e:
-                logger.error(f"❌ Fallback SMTP_EMAIL send failed using {self.fallback_email}: {e}")
+                logger.error("❌ Fallback SMTP_EMAIL send failed using %s: %s", self.fallback_email, e)
                 return False
 
         logger.error("❌ No valid SMTP credentials available (SMTP_EMAILS failed or not set, and SMTP_EMAIL fallback missing).")
@@ -368,22 +851,49 @@ Mind Matrix Team
     
     def is_on_cooldown(self, user_id: int) -> tuple[bool, int]:
         """Check if user is on OTP request cooldown"""
-        if user_id in self.otp_cooldowns:
-            cooldown_end = self.otp_cooldowns[user_id]
-            if datetime.utcnow() < cooldown_end:
-                remaining = int((cooldown_end - datetime.utcnow()).total_seconds())
-                return True, remaining
+        cooldown_end = self.otp_cooldowns.get(user_id)
+        if cooldown_end is not None:
+            now = time.monotonic()
+            if now < cooldown_end:
+                # Round up so the last partial second never reads "0 seconds"
+                return True, math.ceil(cooldown_end - now)
+            del self.otp_cooldowns[user_id]
         return False, 0
     
     def set_cooldown(self, user_id: int):
         """Set OTP request cooldown for user"""
-        self.otp_cooldowns[user_id] = datetime.utcnow() + timedelta(seconds=config.OTP_COOLDOWN)
+        now = time.monotonic()
+        # Opportunistically drop expired entries so the dict stays bounded on a long-running bot
+        if self.otp_cooldowns and len(self.otp_cooldowns) % self.COOLDOWN_SWEEP_SIZE == 0:
+            self.otp_cooldowns = {uid: end for uid, end in self.otp_cooldowns.items() if end > now}
+        self.otp_cooldowns[user_id] = now + config.OTP_COOLDOWN
+    
+    # ============================================
+    # COOLDOWN CHECK
+    # ============================================
+    def otp_cooldown_check():
+        """Refuse OTP requests on cooldown before the command defers or touches the database"""
+        async def predicate(interaction: discord.Interaction) -> bool:
+            on_cooldown, remaining = interaction.command.binding.is_on_cooldown(interaction.user.id)
+            if on_cooldown:
+                await interaction.response.send_message(_COOLDOWN_MESSAGE.format(remaining=remaining), ephemeral=True)
+                return False
+            return True
+        return app_commands.check(predicate)
+    
+    async def cog_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        """Cooldown refusals were already answered by the check; log anything else"""
+        if isinstance(error, app_commands.CheckFailure):
+            return
+        command = interaction.command.name if interaction.command else None
+        logger.error("Ignoring exception in command %r", command, exc_info=error)
     
     # ============================================
     # SLASH COMMANDS
     # ============================================
     @app_commands.command(name="verify", description="Verify your email to access course channels")
     @app_commands.describe(email="Your registered email address")
+    @otp_cooldown_check()
     async def verify(self, interaction: discord.Interaction, email: str):
         """
         Start the verification process by sending an OTP to the user's email
@@ -394,18 +904,7 @@ Mind Matrix Team
         user = interaction.user
         email = email.strip().lower()
         
-        logger.info(f"Verification attempt: {user.name} ({user.id}) with email {email}")
-        
-        # Check cooldown
-        on_cooldown, remaining = self.is_on_cooldown(user.id)
-        if on_cooldown:
-            embed = discord.Embed(
-                title="⏳ Please Wait",
-                description=f"You can request another OTP in **{remaining}** seconds.",
-                color=config.WARNING_COLOR
-            )
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            return
+        logger.info("Verification attempt: %s (%s) with email %s", user.name, user.id, email)
         
         # Check if user is already verified
         existing_student = await db.get_student_by_discord_id(user.id)
@@ -419,7 +918,7 @@ Mind Matrix Team
             return
         
         # Check if email exists in database
-        student = await db.get_student_by_email(email)
+        student = await student_cache.get_student_by_email(email)
         if not student:
             embed = discord.Embed(
                 title="❌ Email Not Found",
@@ -445,41 +944,37 @@ Mind Matrix Team
         otp = self.generate_otp()
         student_name = student.get("name", "Student")
         
-        # Store OTP in database
-        await db.store_otp(email, otp, user.id)
-        
-        # Send OTP email
-        email_sent = await self.send_otp_email(email, otp, student_name)
+        # Store OTP in database - the DB enforces the cooldown too, so a restart or two
+        # overlapping requests can't slip a second code past the in-memory check
+        remaining = await db.store_otp(
+            email, otp, user.id, cooldown_seconds=config.OTP_COOLDOWN, student_name=student_name
+        )
+        if remaining:
+            await interaction.followup.send(_COOLDOWN_MESSAGE.format(remaining=remaining), ephemeral=True)
+            return
         
-        if email_sent:
-            self.set_cooldown(user.id)
-            embed = discord.Embed(
-                title="📧 OTP Sent!",
-                description=f"A verification code has been sent to:\n**{email}**\n\nPlease check your inbox (and spam folder).",
-                color=config.EMBED_COLOR
-            )
-            embed.add_field(
-                name="Next Step",
-                value="Use `/otp code:XXXXXX` to complete verification.",
-                inline=False
-            )
-            embed.add_field(
-                name="⏰ Expires In",
-                value="5 minutes",
-                inline=True
-            )
-            embed.set_footer(text="Code not received? Wait 60 seconds and try again.")
-            
-            await db.log_verification_action(email, user.id, "OTP_SENT", "SUCCESS")
-        else:
-            embed = discord.Embed(
-                title="❌ Error Sending Email",
-                description="We couldn't send the verification email. Please try again later or contact support.",
-                color=config.ERROR_COLOR
-            )
-            await db.log_verification_action(email, user.id, "OTP_SENT", "FAILED", "Email send failed")
+        # Reply right away and send the email in the background - the SMTP round trip
+        # no longer holds the command; _send_otp_in_background reports a failure
+        self.set_cooldown(user.id)
+        embed = discord.Embed(
+            title="📧 OTP Sent!",
+            description=f"A verification code is on its way to:\n**{email}**\n\nPlease check your inbox (and spam folder).",
+            color=config.EMBED_COLOR
+        )
+        embed.add_field(
+            name="Next Step",
+            value="Use `/otp code:XXXXXX` to complete verification.",
+            inline=False
+        )
+        embed.add_field(
+            name="⏰ Expires In",
+            value="5 minutes",
+            inline=True
+        )
+        embed.set_footer(text="Code not received? Wait 60 seconds and try again.")
         
         await interaction.followup.send(embed=embed, ephemeral=True)
+        self._run_in_background(self._send_otp_in_background(interaction, email, otp, student_name))
     
     @app_commands.command(name="otp", description="Enter your OTP code to complete verification")
     @app_commands.describe(code="The 6-digit code sent to your email")
@@ -493,7 +988,7 @@ Mind Matrix Team
         user = interaction.user
         code = code.strip()
         
-        logger.info(f"OTP verification attempt: {user.name} ({user.id})")
+        logger.info("OTP verification attempt: %s (%s)", user.name, user.id)
         
         # Verify OTP
         result = await db.verify_otp(user.id, code)
@@ -510,9 +1005,16 @@ Mind Matrix Team
         
         email = result["email"]
         
-        # OTP is valid - verify the student in database
-        verified = await db.verify_student(email, user.id)
+        # OTP is valid - verify the student and load their course details concurrently
+        verified, course_info = await asyncio.gather(
+            db.verify_student(email, user.id),
+            db.get_student_university_course_batch(email),
+            return_exceptions=True
+        )
         
+        if isinstance(verified, Exception):
+            logger.error("Verification failed for %s: %s", email, verified)
+            verified = False
         if not verified:
             embed = discord.Embed(
                 title="❌ Verification Error",
@@ -522,10 +1024,17 @@ Mind Matrix Team
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
         
+        # Verified/pending counts and this student's record just changed
+        stats_cache.invalidate()
+        student_cache.invalidate(email)
+        
         # ============================================
-        # GET UNIVERSITY, COURSE & BATCH FROM DATABASE (New 5-column CSV format)
+        # UNIVERSITY, COURSE & BATCH FROM DATABASE (New 5-column CSV format)
         # ============================================
-        university, course, batch = await db.get_student_university_course_batch(email)
+        if isinstance(course_info, Exception):
+            logger.error("Failed to load course details for %s: %s", email, course_info)
+            course_info = (None, None, None)
+        university, course, batch = course_info
         
         roles_to_add = []
         role_assignment_errors = []
@@ -536,7 +1045,7 @@ Mind Matrix Team
             if verified_role:
                 roles_to_add.append(verified_role)
             else:
-                logger.warning(f"VERIFIED_ROLE_ID {config.VERIFIED_ROLE_ID} not found in guild. Check config.py")
+                logger.warning("VERIFIED_ROLE_ID %s not found in guild. Check config.py", config.VERIFIED_ROLE_ID)
                 role_assignment_errors.append("Verified role not found")
         
         # ============================================
@@ -545,14 +1054,14 @@ Mind Matrix Team
         category = None
         
         if course:
-            logger.info(f"Processing student: University='{university}', Course='{course}', Batch='{batch}'")
+            logger.info("Processing student: University='%s', Course='%s', Batch='%s'", university, course, batch)
             
             # Step 1: Ensure Course resources exist (Category + shared channels) - now with university prefix
             course_role, category = await self.ensure_course_resources(interaction.guild, university, course)
             
             if course_role:
                 roles_to_add.append(course_role)
-                logger.info(f"Adding course role: {course_role.name}")
+                logger.info("Adding course role: %s", course_role.name)
             else:
                 role_assignment_errors.append(f"Could not create/find course role for '{university}-{course}' if university else '{course}'")
             
@@ -568,59 +1077,41 @@ Mind Matrix Team
                 
                 if batch_role:
                     roles_to_add.append(batch_role)
-                    logger.info(f"Adding batch role: {batch_role.name}")
+                    logger.info("Adding batch role: %s", batch_role.name)
                 else:
                     role_assignment_errors.append(f"Could not create/find batch role for '{university}-{batch}' if university else '{batch}'")
         else:
-            logger.warning(f"No course found in database for email: {email}")
+            logger.warning("No course found in database for email: %s", email)
         
         # Assign roles to user
         assigned_roles = []
         try:
             if roles_to_add:
-                await user.add_roles(*roles_to_add, reason=f"Email verified: {email}")
+                # Skip roles the member already has and apply the rest with one Modify Guild Member call
+                current_roles = [r for r in user.roles if not r.is_default()]
+                current_ids = {r.id for r in current_roles}
+                new_roles = [r for r in roles_to_add if r.id not in current_ids]
+                if new_roles:
+                    await user.edit(roles=current_roles + new_roles, reason=f"Email verified: {email}")
                 assigned_roles = [r.name for r in roles_to_add]
-                logger.info(f"Successfully assigned roles to {user.name} ({user.id}): {assigned_roles}")
+                logger.info("Successfully assigned roles to %s (%s): %s", user.name, user.id, assigned_roles)
             else:
-                logger.warning(f"No roles to assign for {user.name} ({user.id}). Check role configuration.")
+                logger.warning("No roles to assign for %s (%s). Check role configuration.", user.name, user.id)
         except discord.Forbidden:
-            logger.error(f"PERMISSION ERROR: Bot lacks permission to assign roles to {user.name}. "
-                         f"Ensure bot role is ABOVE the roles it needs to assign in Server Settings → Roles.")
+            logger.error("PERMISSION ERROR: Bot lacks permission to assign roles to %s. "
+                         "Ensure bot role is ABOVE the roles it needs to assign in Server Settings → Roles.", user.name)
             role_assignment_errors.append("Bot lacks permission (check role hierarchy)")
         except discord.HTTPException as e:
-            logger.error(f"Discord API error while assigning roles to {user.name}: {e}")
+            logger.error("Discord API error while assigning roles to %s: %s", user.name, e)
             role_assignment_errors.append(f"Discord API error: {e.status}")
         except Exception as e:
-            logger.error(f"Unexpected error assigning roles to {user.name}: {type(e).__name__}: {e}")
+            logger.error("Unexpected error assigning roles to %s: %s: %s", user.name, type(e).__name__, e)
             role_assignment_errors.append("Unexpected error")
         
         # Success message
-        embed = discord.Embed(
-            title="✅ Verification Successful!",
-            description=config.VERIFICATION_SUCCESS.format(username=user.display_name),
-            color=config.SUCCESS_COLOR
-        )
-        embed.add_field(name="Email", value=email, inline=True)
-        if university:
-            embed.add_field(name="University", value=university, inline=True)
-        embed.add_field(name="Course", value=course or "N/A", inline=True)
-        if batch:
-            embed.add_field(name="Batch", value=batch, inline=True)
-        
-        # Show assigned roles
-        if assigned_roles:
-            embed.add_field(name="Roles Assigned", value=", ".join(assigned_roles), inline=False)
-        
-        # Warn user if there were any role assignment issues
+        embed = self._make_success_embed(user, email, university, course, batch, assigned_roles, role_assignment_errors)
         if role_assignment_errors:
-            embed.add_field(
-                name="⚠️ Notice", 
-                value="Some roles couldn't be assigned. Contact an admin if you can't access your course channels.",
-                inline=False
-            )
-            logger.warning(f"Role assignment issues for {user.name}: {role_assignment_errors}")
-        
-        embed.set_thumbnail(url=user.avatar.url if user.avatar else None)
+            logger.warning("Role assignment issues for %s: %s", user.name, role_assignment_errors)
         
         await db.log_verification_action(
             email, user.id, "VERIFICATION_COMPLETE", "SUCCESS", 
@@ -634,7 +1125,7 @@ Mind Matrix Team
             log_embed = discord.Embed(
                 title="🎓 New Student Verified",
                 color=config.SUCCESS_COLOR,
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             log_embed.add_field(name="User", value=f"{user.mention} ({user.name})", inline=True)
             log_embed.add_field(name="Email", value=email, inline=True)
@@ -645,68 +1136,63 @@ Mind Matrix Team
                 log_embed.add_field(name="Batch", value=batch, inline=True)
             log_embed.set_footer(text=f"User ID: {user.id}")
             
-            try:
-                await log_channel.send(embed=log_embed)
-            except Exception as e:
-                logger.error(f"Failed to send log message: {e}")
+            # Don't hold the command on the admin log post
+            self._run_in_background(self._post_admin_log(log_channel, log_embed))
     
-    @app_commands.command(name="reverify", description="Request a new verification code")
-    async def reverify(self, interaction: discord.Interaction):
-        """Allow users to request re-verification if they have a pending OTP"""
-        await interaction.response.defer(ephemeral=True)
-        
-        user = interaction.user
-        
-        # Check if user has a pending OTP
-        pending = await db.get_pending_otp(user.id)
+    async def _resend_otp(self, interaction: discord.Interaction) -> _ResendOutcome:
+        """Issue a fresh code for the user's pending verification and start emailing it"""
+        user_id = interaction.user.id
         
+        # Check if user has a pending OTP (the student's name was stored with it by /verify)
+        pending = await db.get_pending_otp(user_id)
         if not pending:
-            embed = discord.Embed(
-                title="ℹ️ No Pending Verification",
-                description="You don't have a pending verification.\nUse `/verify email:your@email.com` to start.",
-                color=config.EMBED_COLOR
-            )
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            return
-        
-        # Check cooldown
-        on_cooldown, remaining = self.is_on_cooldown(user.id)
-        if on_cooldown:
-            embed = discord.Embed(
-                title="⏳ Please Wait",
-                description=f"You can request another OTP in **{remaining}** seconds.",
-                color=config.WARNING_COLOR
-            )
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            return
+            return _ResendOutcome(False, error=_NO_PENDING_MESSAGE)
         
         email = pending["email"]
-        student = await db.get_student_by_email(email)
+        student_name = pending.get("student_name") or "Student"
         
-        # Generate and send new OTP
+        # Generate and store the new OTP, then send the email in the background
         otp = self.generate_otp()
-        await db.store_otp(email, otp, user.id)
+        remaining = await db.store_otp(
+            email, otp, user_id, cooldown_seconds=config.OTP_COOLDOWN, student_name=pending.get("student_name")
+        )
+        if remaining:
+            return _ResendOutcome(False, error=_COOLDOWN_MESSAGE.format(remaining=remaining))
         
-        email_sent = await self.send_otp_email(email, otp, student.get("name", "Student") if student else "Student")
+        self.set_cooldown(user_id)
+        self._run_in_background(self._send_otp_in_background(interaction, email, otp, student_name))
+        return _ResendOutcome(True, email=email)
+    
+    def _forget_resend(self, user_id: int, task: asyncio.Task):
+        """Done-callback: drop a finished /reverify unless a newer one already replaced it"""
+        if self._resend_inflight.get(user_id) is task:
+            del self._resend_inflight[user_id]
+    
+    @app_commands.command(name="reverify", description="Request a new verification code")
+    @otp_cooldown_check()
+    async def reverify(self, interaction: discord.Interaction):
+        """Allow users to request re-verification if they have a pending OTP"""
+        await interaction.response.defer(ephemeral=True)
         
-        if email_sent:
-            self.set_cooldown(user.id)
-            embed = discord.Embed(
-                title="📧 New OTP Sent!",
-                description=f"A new verification code has been sent to:\n**{email}**",
-                color=config.EMBED_COLOR
-            )
-            embed.add_field(name="Next Step", value="Use `/otp code:XXXXXX` to complete verification.", inline=False)
-        else:
-            embed = discord.Embed(
-                title="❌ Error",
-                description="Failed to send new OTP. Please try again later.",
-                color=config.ERROR_COLOR
-            )
+        user_id = interaction.user.id
         
+        # A double-submitted /reverify shares the first one's result instead of racing it
+        # through the database and SMTP; shield so one caller going away doesn't cancel it
+        task = self._resend_inflight.get(user_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._resend_otp(interaction))
+            self._resend_inflight[user_id] = task
+            task.add_done_callback(functools.partial(self._forget_resend, user_id))
+        outcome = await asyncio.shield(task)
+        
+        if not outcome.ok:
+            await interaction.followup.send(outcome.error, ephemeral=True)
+            return
+        
+        embed = self._new_otp_embed_base.copy()
+        embed.description = f"A new verification code is on its way to:\n**{outcome.email}**"
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-
 async def setup(bot: commands.Bot):
     """Setup function to add the cog to the bot"""
     await bot.add_cog(Verification(bot))